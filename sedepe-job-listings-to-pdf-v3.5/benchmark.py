@@ -0,0 +1,70 @@
+import os
+import time
+import argparse
+import tempfile
+
+from reportlab.platypus import Table
+
+from generate_pdf_code import ler_csv, criar_pdf, criar_pdf_canvas, criar_documento, construir_documento, formatar_celulas, preparar_tabela, obter_modelo
+
+
+TAMANHOS = [1000, 10000, 100000]
+
+
+def amostrar_vagas(dados, linhas, semente=0):
+    return dados.sample(n=linhas, replace=True, random_state=semente).sort_values(by='Posto')
+
+
+def criar_pdf_monolitico(dados, nome_pdf):
+    modelo = obter_modelo()
+    tabela = Table([list(modelo.cabecalho)] + formatar_celulas(preparar_tabela(dados)),
+                   colWidths=list(modelo.col_widths), rowHeights=modelo.row_height, repeatRows=0)
+    tabela.setStyle(modelo.tabela_style)
+    construir_documento(criar_documento(nome_pdf), [tabela])
+
+
+def medir(funcao, dados, nome_pdf):
+    inicio = time.perf_counter()
+    funcao(dados, nome_pdf)
+    return time.perf_counter() - inicio
+
+
+def medir_layout(dados, tamanhos, monolitico_ate=0):
+    resultados = []
+
+    with tempfile.TemporaryDirectory() as pasta_temporaria:
+        nome_pdf = os.path.join(pasta_temporaria, "benchmark.pdf")
+
+        for linhas in tamanhos:
+            amostra = amostrar_vagas(dados, linhas)
+            resultado = {
+                "linhas": linhas,
+                "paginado": medir(lambda d, n: criar_pdf(d, n, "1 de Janeiro de 2024"), amostra, nome_pdf),
+                "canvas": medir(lambda d, n: criar_pdf_canvas(d, n, "1 de Janeiro de 2024"), amostra, nome_pdf),
+            }
+            if linhas <= monolitico_ate:
+                resultado["monolitico"] = medir(criar_pdf_monolitico, amostra, nome_pdf)
+            resultados.append(resultado)
+
+    return resultados
+
+
+def imprimir_resultados(resultados):
+    print(f"{'Linhas':>10} {'Paginado (s)':>14} {'us/linha':>10} {'Canvas (s)':>12} {'us/linha':>10} {'Ganho':>7} {'Monolítico (s)':>16} {'us/linha':>10}")
+    for resultado in resultados:
+        linhas = resultado["linhas"]
+        linha = f"{linhas:>10} {resultado['paginado']:>14.2f} {resultado['paginado'] / linhas * 1e6:>10.1f}"
+        linha += f" {resultado['canvas']:>12.2f} {resultado['canvas'] / linhas * 1e6:>10.1f} {resultado['paginado'] / resultado['canvas']:>6.1f}x"
+        if "monolitico" in resultado:
+            linha += f" {resultado['monolitico']:>16.2f} {resultado['monolitico'] / linhas * 1e6:>10.1f}"
+        print(linha)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede o tempo de layout do relatório (platypus e canvas) para quantidades crescentes de vagas.")
+    parser.add_argument("csv", nargs="?", default="exemplo.csv", help="exportação usada como base para amostrar as vagas")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS, help="quantidades de linhas a medir")
+    parser.add_argument("--monolitico-ate", type=int, default=0, help="também mede a tabela única antiga até esta quantidade de linhas")
+    args = parser.parse_args()
+
+    imprimir_resultados(medir_layout(ler_csv(args.csv), args.tamanhos, args.monolitico_ate))
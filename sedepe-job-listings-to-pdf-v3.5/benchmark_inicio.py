@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+
+PASTA_SCRIPT = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(PASTA_SCRIPT, "generate_pdf_code.py")
+IMG_PATH = "governo-copia.png"
+REPETICOES = 5
+
+# gera um relatório a partir do processo recém-criado e informa se o pandas chegou a ser importado
+CODIGO_RELATORIO = """
+import sys
+import generate_pdf_code
+nome_pdf, erro = generate_pdf_code.gerar_relatorio(sys.argv[1], sys.argv[2], "1 de Janeiro de 2024", leitor=sys.argv[3])
+if erro is not None:
+    raise erro
+print("pandas" in sys.modules)
+"""
+
+CODIGO_IMPORTACAO = """
+import sys
+import generate_pdf_code
+print("pandas" in sys.modules)
+"""
+
+
+def executar(comando, pasta):
+    inicio = time.perf_counter()
+    resultado = subprocess.run(comando, cwd=pasta, capture_output=True, text=True, check=True)
+    return time.perf_counter() - inicio, resultado.stdout.strip().splitlines()[-1:] == ["True"]
+
+
+def medir(comando, pasta, repeticoes, preparar=None):
+    tempos = []
+    usou_pandas = False
+
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        tempo, pandas_carregado = executar(comando, pasta)
+        tempos.append(tempo)
+        usou_pandas = usou_pandas or pandas_carregado
+
+    return {"mediana": statistics.median(tempos), "minimo": min(tempos), "pandas": usou_pandas}
+
+
+def pasta_da_exportacao(pasta_temporaria, arquivo_csv):
+    # o CLI lê todos os .csv da pasta atual e o logo por caminho relativo
+    pasta = os.path.join(pasta_temporaria, "cli")
+    os.makedirs(pasta)
+    os.symlink(os.path.abspath(arquivo_csv), os.path.join(pasta, os.path.basename(arquivo_csv)))
+    shutil.copy(os.path.join(PASTA_SCRIPT, IMG_PATH), pasta)
+    return pasta
+
+
+def medir_inicio(arquivo_csv, repeticoes=REPETICOES):
+    resultados = {}
+    arquivo_csv = os.path.abspath(arquivo_csv)
+
+    with tempfile.TemporaryDirectory() as pasta_temporaria:
+        saida = os.path.join(pasta_temporaria, "output")
+        os.makedirs(saida)
+        pasta_cli = pasta_da_exportacao(pasta_temporaria, arquivo_csv)
+
+        resultados["importação"] = medir([sys.executable, "-c", CODIGO_IMPORTACAO], PASTA_SCRIPT, repeticoes)
+        for leitor in ("bytes", "mmap", "pandas"):
+            resultados[f"relatório ({leitor})"] = medir([sys.executable, "-c", CODIGO_RELATORIO, arquivo_csv, saida, leitor], PASTA_SCRIPT, repeticoes)
+
+        limpar_manifesto = lambda: shutil.rmtree(os.path.join(pasta_cli, "output"), ignore_errors=True)
+        resultados["CLI, primeira execução"] = medir([sys.executable, SCRIPT], pasta_cli, repeticoes, limpar_manifesto)
+        resultados["CLI, sem alterações"] = medir([sys.executable, SCRIPT], pasta_cli, repeticoes)
+
+    return resultados
+
+
+def imprimir_resultados(resultados):
+    print(f"{'Cenário':<24} {'Mediana (ms)':>13} {'Mínimo (ms)':>12} {'pandas':>7}")
+    for cenario, resultado in resultados.items():
+        print(f"{cenario:<24} {resultado['mediana'] * 1000:>13.0f} {resultado['minimo'] * 1000:>12.0f} {'sim' if resultado['pandas'] else 'não':>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede a latência de um processo novo até o PDF pronto: importação, relatório pequeno com cada leitor e execução sem alterações.")
+    parser.add_argument("csv", nargs="?", default="exemplo.csv", help="exportação usada nas medições")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES, help="execuções de cada cenário; mostra a mediana e o mínimo")
+    args = parser.parse_args()
+
+    imprimir_resultados(medir_inicio(args.csv, args.repeticoes))
@@ -0,0 +1,66 @@
+import os
+import time
+import argparse
+
+from generate_pdf_code import LEITORES, preparar_tabela
+from gerar_exportacao import exportacao_sintetica
+
+
+TAMANHOS = [1000, 10000, 100000]
+REPETICOES = 3
+
+
+def medir_leitor(leitor, arquivo_csv, repeticoes):
+    leitura = []
+    preparo = []
+
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        dados = LEITORES[leitor](arquivo_csv)
+        leitura.append(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        table_data = preparar_tabela(dados)
+        preparo.append(time.perf_counter() - inicio)
+
+    return {"leitura": min(leitura), "preparo": min(preparo)}, [[str(valor) for valor in row] for row in table_data]
+
+
+def medir_leitores(tamanhos, pasta, base_csv, leitores, repeticoes=REPETICOES):
+    resultados = []
+
+    for linhas in tamanhos:
+        arquivo_csv = exportacao_sintetica(pasta, linhas, base_csv)
+        tamanho_mb = os.path.getsize(arquivo_csv) / (1024 * 1024)
+        referencia = None
+
+        for leitor in leitores:
+            tempos, tabela = medir_leitor(leitor, arquivo_csv, repeticoes)
+            if referencia is None:
+                referencia = tabela
+            resultados.append({"leitor": leitor, "linhas": linhas, "mb": tamanho_mb, "igual": tabela == referencia, **tempos})
+
+    return resultados
+
+
+def imprimir_resultados(resultados):
+    print(f"{'Leitor':>8} {'Linhas':>9} {'MB':>8} {'Leitura (s)':>12} {'MB/s':>8} {'Preparo (s)':>12} {'Total (s)':>10} {'Tabela':>8}")
+    for resultado in resultados:
+        total = resultado["leitura"] + resultado["preparo"]
+        linha = f"{resultado['leitor']:>8} {resultado['linhas']:>9} {resultado['mb']:>8.1f} {resultado['leitura']:>12.3f} {resultado['mb'] / resultado['leitura']:>8.0f}"
+        linha += f" {resultado['preparo']:>12.3f} {total:>10.3f} {'igual' if resultado['igual'] else 'DIFERE':>8}"
+        print(linha)
+
+    print("Preparo = normalização e ordenação; a tabela de cada leitor é comparada com a do primeiro.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara os leitores de CSV (bytes, mmap e pandas) sobre exportações sintéticas de tamanhos crescentes.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS, help="quantidades de vagas das exportações sintéticas")
+    parser.add_argument("--leitores", nargs="+", choices=sorted(LEITORES), default=sorted(LEITORES, reverse=True), help="leitores a comparar; o primeiro é a referência")
+    parser.add_argument("--pasta", default="sinteticos", help="pasta das exportações sintéticas (geradas se ausentes)")
+    parser.add_argument("--base", default="exemplo.csv", help="exportação real usada para gerar as sintéticas")
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES, help="execuções de cada leitor; mostra a melhor")
+    args = parser.parse_args()
+
+    imprimir_resultados(medir_leitores(args.tamanhos, os.path.abspath(args.pasta), os.path.abspath(args.base), args.leitores, args.repeticoes))
@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import importlib.util
+from contextlib import contextmanager
+
+from reportlab.platypus import SimpleDocTemplate
+
+from gerar_exportacao import exportacao_sintetica
+
+
+VERSOES = ["v1", "v1.5", "v2", "v2.5", "v3", "v3.5"]
+TAMANHOS = [1000, 10000]
+ETAPAS = ["leitura", "normalizacao", "agrupamento", "layout", "build"]
+FUNCOES_POR_ETAPA = {
+    "normalizacao": ["normalizar_dados"],
+    "agrupamento": ["ordenar_tabela", "agrupar_por_posto", "contar_vagas"],
+}
+PASTA_RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMG_PATH = "governo-copia.png"
+
+
+def pasta_versao(versao):
+    return os.path.join(PASTA_RAIZ, f"sedepe-job-listings-to-pdf-{versao}")
+
+
+def carregar_versao(versao):
+    nome = "generate_pdf_code_" + versao.replace(".", "_")
+    spec = importlib.util.spec_from_file_location(nome, os.path.join(pasta_versao(versao), "generate_pdf_code.py"))
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nome] = modulo
+    spec.loader.exec_module(modulo)
+
+    # a v3 lê a data do global definido no seu __main__
+    if hasattr(modulo, "obter_data_em_portugues") and not hasattr(modulo, "data_texto"):
+        modulo.data_texto = modulo.obter_data_em_portugues()
+    return modulo
+
+
+@contextmanager
+def cronometro(tempos, etapa):
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tempos[etapa] = tempos.get(etapa, 0.0) + time.perf_counter() - inicio
+
+
+def cronometrar(funcao, tempos, etapa):
+    def medida(*args, **kwargs):
+        with cronometro(tempos, etapa):
+            return funcao(*args, **kwargs)
+    return medida
+
+
+@contextmanager
+def instrumentar(modulo, tempos):
+    originais = [(SimpleDocTemplate, "build", SimpleDocTemplate.build)]
+    SimpleDocTemplate.build = cronometrar(SimpleDocTemplate.build, tempos, "build")
+
+    for etapa, funcoes in FUNCOES_POR_ETAPA.items():
+        for nome in funcoes:
+            if hasattr(modulo, nome):
+                originais.append((modulo, nome, getattr(modulo, nome)))
+                setattr(modulo, nome, cronometrar(getattr(modulo, nome), tempos, etapa))
+
+    try:
+        yield
+    finally:
+        for alvo, nome, original in originais:
+            setattr(alvo, nome, original)
+
+
+@contextmanager
+def pasta_de_trabalho(versao, arquivo_csv):
+    # as versões antigas leem todos os .csv da pasta atual e o logo por caminho relativo
+    anterior = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as pasta_temporaria:
+        os.symlink(os.path.abspath(arquivo_csv), os.path.join(pasta_temporaria, os.path.basename(arquivo_csv)))
+        logo = os.path.join(pasta_versao(versao), IMG_PATH)
+        if os.path.exists(logo):
+            shutil.copy(logo, pasta_temporaria)
+
+        os.chdir(pasta_temporaria)
+        try:
+            yield os.path.basename(arquivo_csv)
+        finally:
+            os.chdir(anterior)
+
+
+def medir_versao(versao, modulo, arquivo_csv):
+    tempos = {}
+
+    with pasta_de_trabalho(versao, arquivo_csv) as nome_csv:
+        inicio = time.perf_counter()
+
+        with cronometro(tempos, "leitura"):
+            dados = modulo.ler_csv(nome_csv)
+            if isinstance(dados, list):
+                dados = dados[0]
+
+        with instrumentar(modulo, tempos):
+            with cronometro(tempos, "agrupamento"):
+                dados = dados.sort_values(by="Posto")
+
+            antes = sum(tempos.values())
+            inicio_pdf = time.perf_counter()
+            modulo.criar_pdf(dados, "relatorio.pdf")
+            duracao_pdf = time.perf_counter() - inicio_pdf
+
+        total = time.perf_counter() - inicio
+
+    tempos["layout"] = duracao_pdf - (sum(tempos.values()) - antes)
+    tempos["total"] = total
+    return tempos
+
+
+def executar(versoes, tamanhos, pasta, base_csv):
+    resultados = []
+
+    for linhas in tamanhos:
+        arquivo_csv = exportacao_sintetica(pasta, linhas, base_csv)
+
+        for versao in versoes:
+            try:
+                tempos = medir_versao(versao, carregar_versao(versao), arquivo_csv)
+                resultados.append({"versao": versao, "linhas": linhas, **tempos})
+            except Exception as e:
+                print(f"Erro ao medir a versão {versao} com {linhas} vagas: {e}", file=sys.stderr)
+                resultados.append({"versao": versao, "linhas": linhas, "erro": str(e)})
+
+    return resultados
+
+
+def imprimir_resultados(resultados):
+    print(f"{'Versão':>7} {'Linhas':>9} " + " ".join(f"{etapa:>12}" for etapa in ETAPAS) + f" {'total':>10} {'us/linha':>10}")
+    for resultado in resultados:
+        linha = f"{resultado['versao']:>7} {resultado['linhas']:>9} "
+        if "erro" in resultado:
+            print(linha + f"erro: {resultado['erro']}")
+            continue
+
+        linha += " ".join(f"{resultado[etapa]:>12.3f}" if etapa in resultado else f"{'-':>12}" for etapa in ETAPAS)
+        linha += f" {resultado['total']:>10.3f} {resultado['total'] / resultado['linhas'] * 1e6:>10.1f}"
+        print(linha)
+
+    print("Etapas sem medida própria (-) estão incluídas no layout daquela versão.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mede cada etapa da geração do relatório em todas as versões, sobre exportações sintéticas.")
+    parser.add_argument("--versoes", nargs="+", default=VERSOES, choices=VERSOES, help="versões do gerador a medir")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS, help="quantidades de vagas das exportações sintéticas")
+    parser.add_argument("--pasta", default="sinteticos", help="pasta das exportações sintéticas (geradas se ausentes)")
+    parser.add_argument("--base", default="exemplo.csv", help="exportação real usada para gerar as sintéticas")
+    parser.add_argument("--json", help="também grava os resultados neste arquivo JSON")
+    args = parser.parse_args()
+
+    resultados = executar(args.versoes, args.tamanhos, os.path.abspath(args.pasta), os.path.abspath(args.base))
+    imprimir_resultados(resultados)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump(resultados, arquivo, ensure_ascii=False, indent=2)
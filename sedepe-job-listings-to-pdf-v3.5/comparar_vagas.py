@@ -0,0 +1,99 @@
+import os
+import argparse
+import pandas as pd
+from reportlab.platypus import Table, Paragraph
+
+from generate_pdf_code import (
+    DATA_COLUMNS, ROW_HEIGHT, ler_csv, normalizar_dados, criar_documento, obter_modelo,
+    construir_documento, obter_data_em_portugues,
+)
+
+
+COLUNA_ID = "Id. Vaga"
+
+SITUACOES = ["Nova", "Alterada", "Removida"]
+
+CABECALHO_ALTERACOES = ["Situação", "Agência", "Vagas", "Descrição", "Local de Trabalho", "Contrato", "Salário"]
+
+COL_WIDTHS_ALTERACOES = [60, 90, 50, 190, 135, 75, 132]
+
+
+def ler_csv_com_id(arquivo_csv):
+    return ler_csv(arquivo_csv, colunas=DATA_COLUMNS + [COLUNA_ID])
+
+
+def indexar_vagas(dados):
+    normalizados = normalizar_dados(dados)
+    for coluna in normalizados.columns:
+        if isinstance(normalizados[coluna].dtype, pd.CategoricalDtype):
+            normalizados[coluna] = normalizados[coluna].astype(object)
+
+    normalizados.index = pd.Index(dados[COLUNA_ID].astype(str).str.strip(), name=COLUNA_ID)
+    return normalizados[~normalizados.index.duplicated(keep="last")]
+
+
+def comparar_vagas(anterior, atual):
+    anterior = indexar_vagas(anterior)
+    atual = indexar_vagas(atual)
+
+    novas = atual.loc[atual.index.difference(anterior.index, sort=False)].assign(Situação="Nova")
+    removidas = anterior.loc[anterior.index.difference(atual.index, sort=False)].assign(Situação="Removida")
+
+    comuns = atual.index.intersection(anterior.index, sort=False)
+    antes = anterior.loc[comuns]
+    depois = atual.loc[comuns]
+    mudou_vagas = antes["Vagas"].astype(str) != depois["Vagas"].astype(str)
+    mudou_salario = antes["Salário"] != depois["Salário"]
+    alteradas = depois[mudou_vagas | mudou_salario].assign(Situação="Alterada")
+    alteradas["Vagas"] = (antes["Vagas"].astype(str) + " » " + depois["Vagas"].astype(str)).where(mudou_vagas, depois["Vagas"].astype(str))
+    alteradas["Salário"] = (antes["Salário"] + " » " + depois["Salário"]).where(mudou_salario, depois["Salário"])
+
+    alteracoes = pd.concat([novas, alteradas, removidas])
+    alteracoes["Vagas"] = alteracoes["Vagas"].astype(str)
+    alteracoes["Situação"] = pd.Categorical(alteracoes["Situação"], categories=SITUACOES, ordered=True)
+    alteracoes = alteracoes.assign(_inicial=alteracoes["Agência"].str[:1].str.upper())
+    alteracoes = alteracoes.sort_values(["Situação", "_inicial", "Agência", "Contrato"], kind="stable")
+
+    return alteracoes[CABECALHO_ALTERACOES]
+
+
+def criar_pdf_alteracoes(alteracoes, nome_pdf, data_texto=None):
+    if data_texto is None:
+        data_texto = obter_data_em_portugues()
+
+    doc = criar_documento(nome_pdf)
+    modelo = obter_modelo()
+    contagem = alteracoes["Situação"].value_counts()
+
+    table_parts = [
+        modelo.criar_logo(),
+        Paragraph("Alterações nas vagas do dia: " + data_texto, modelo.obs_style),
+        Paragraph(" | ".join(f"{situacao}s: {contagem.get(situacao, 0)}" for situacao in SITUACOES), modelo.obs_style),
+    ]
+
+    if len(alteracoes):
+        tabela = Table([CABECALHO_ALTERACOES] + alteracoes.astype(str).values.tolist(),
+                       colWidths=COL_WIDTHS_ALTERACOES, rowHeights=ROW_HEIGHT, repeatRows=1)
+        tabela.setStyle(modelo.tabela_style)
+        table_parts.append(tabela)
+    else:
+        table_parts.append(Paragraph("Nenhuma alteração em relação à exportação anterior."))
+
+    return construir_documento(doc, table_parts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um PDF com as vagas novas, removidas e alteradas entre duas exportações da SEDEPE.")
+    parser.add_argument("anterior", help="exportação anterior (por exemplo, a de ontem)")
+    parser.add_argument("atual", help="exportação atual")
+    args = parser.parse_args()
+
+    pasta_output = "output"
+
+    if not os.path.exists(pasta_output):
+        os.makedirs(pasta_output)
+
+    nome_pdf = os.path.join(pasta_output, os.path.splitext(os.path.basename(args.atual))[0] + "_alteracoes.pdf")
+    alteracoes = comparar_vagas(ler_csv_com_id(args.anterior), ler_csv_com_id(args.atual))
+    criar_pdf_alteracoes(alteracoes, nome_pdf)
+    print(f"Relatório de alterações gerado com sucesso: {nome_pdf}")
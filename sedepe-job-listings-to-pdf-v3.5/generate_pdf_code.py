@@ -1,55 +1,415 @@
+from __future__ import annotations
+
+import io
 import os
-import pandas as pd
+import html
+import re
+import sys
+import csv
+import json
+import shutil
+import codecs
+import hashlib
+import argparse
+import unicodedata
+import tempfile
+import time
+import cProfile
 import datetime
-from reportlab.lib.pagesizes import landscape, letter
-from reportlab.platypus import SimpleDocTemplate, Image, Table, TableStyle, Paragraph, PageBreak, Spacer
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
+from array import array
+from functools import lru_cache
+from operator import itemgetter
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# pandas, numpy, reportlab e PIL são importados dentro das funções que os usam:
+# relatórios pequenos e execuções que só consultam o manifesto ou o cache não pagam o custo
+if TYPE_CHECKING:
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.lib.utils import ImageReader
+    from reportlab.platypus import TableStyle
+
+
+DATA_COLUMNS = ["Posto", "Ocupação", "Qtd. Vagas Disponíveis", "Município Local de Trabalho", "Forma de Contratação", "Salário", "Frequência de Pagamento", "Escolaridade", "Tempo de Experiência", "Aceita Deficientes"]
+
+COLUNAS_CATEGORICAS = ["Posto", "Forma de Contratação", "Frequência de Pagamento", "Escolaridade", "Aceita Deficientes"]
+
+
+TAMANHO_BLOCO = 50000
+
+# no modo automático, abaixo deste tamanho o CSV é lido em bytes, sem importar numpy nem pandas;
+# acima dele o arquivo é mapeado em memória e só os campos usados viram strings
+LIMITE_LEITURA_SIMPLES = 32 * 1024 * 1024
+
+# lida como texto, a quantidade não vira float quando o total do rodapé passa de 999 ("1.234")
+TIPOS_COLUNAS = {"Qtd. Vagas Disponíveis": str}
+
+BLOCO_MAPEAMENTO = 8 * 1024 * 1024
+
+AMOSTRA_CODIFICACAO = 16 * 1024
+CODIFICACAO_PADRAO = "latin1"
+
+
+def ler_amostras(arquivo, tamanho=AMOSTRA_CODIFICACAO):
+    posicao = arquivo.tell()
+    inicio = arquivo.read(tamanho)
+    fim = b""
+    if len(inicio) == tamanho:
+        arquivo.seek(max(arquivo.seek(0, os.SEEK_END) - tamanho, posicao + tamanho))
+        fim = arquivo.read(tamanho)
+    arquivo.seek(posicao)
+    return inicio, fim
+
+
+def codificacao_das_amostras(inicio, fim=b""):
+    if inicio.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+
+    amostra = inicio + b"\n" + fim
+    if amostra.isascii():
+        return CODIFICACAO_PADRAO
+
+    try:
+        # as amostras podem cortar um caractere multibyte nas pontas
+        codecs.getincrementaldecoder("utf-8")().decode(inicio, final=False)
+        codecs.getincrementaldecoder("utf-8")().decode(fim.lstrip(bytes(range(0x80, 0xC0))), final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    # 0x80-0x9F são controles em latin-1, mas aspas, travessões e € no cp1252 do Windows
+    if re.search(rb"[\x80-\x9f]", amostra):
+        try:
+            amostra.decode("cp1252")
+            return "cp1252"
+        except UnicodeDecodeError:
+            pass
+    return CODIFICACAO_PADRAO
+
+
+@lru_cache(maxsize=64)
+def detectar_codificacao_arquivo(caminho, modificado_em, tamanho):
+    with open(caminho, "rb") as arquivo:
+        return codificacao_das_amostras(*ler_amostras(arquivo))
+
+
+def detectar_codificacao(arquivo_csv):
+    if hasattr(arquivo_csv, "read"):
+        return codificacao_das_amostras(*ler_amostras(arquivo_csv))
+
+    estado = os.stat(arquivo_csv)
+    return detectar_codificacao_arquivo(arquivo_csv, estado.st_mtime_ns, estado.st_size)
+
+
+def remover_preenchimento(df):
+    import pandas as pd
+
+    for coluna in df.columns:
+        if pd.api.types.is_string_dtype(df[coluna]):
+            df[coluna] = df[coluna].str.rstrip()
+    return df
+
+
+def eh_rodape(posto):
+    # o rodapé de totais da exportação não tem posto, só "-": sem ele, a última linha é uma vaga como as outras
+    return isinstance(posto, str) and posto.strip() == "-"
+
+
+def categorizar(df, colunas):
+    for coluna in colunas:
+        df[coluna] = df[coluna].astype("category")
+    return df
+
+
+def preparar_bloco(bloco):
+    return categorizar(remover_preenchimento(bloco), COLUNAS_CATEGORICAS)
+
+
+def concatenar_blocos(blocos):
+    import pandas as pd
+    from pandas.api.types import union_categoricals
+
+    for coluna in COLUNAS_CATEGORICAS:
+        categorias = union_categoricals([bloco[coluna] for bloco in blocos]).categories
+        for bloco in blocos:
+            bloco[coluna] = bloco[coluna].cat.set_categories(categorias)
+
+    return pd.concat(blocos)
+
+
+def ler_csv_em_blocos(arquivo_csv, tamanho_bloco=TAMANHO_BLOCO, colunas=DATA_COLUMNS):
+    import pandas as pd
+
+    leitor = pd.read_csv(arquivo_csv, sep=';', usecols=colunas, dtype=TIPOS_COLUNAS, encoding=detectar_codificacao(arquivo_csv), chunksize=tamanho_bloco)
+    bloco_anterior = None
+
+    with leitor:
+        for bloco in leitor:
+            if bloco_anterior is not None:
+                yield preparar_bloco(bloco_anterior)
+            bloco_anterior = bloco
+
+    if bloco_anterior is not None:
+        if "Posto" in colunas and len(bloco_anterior) and eh_rodape(bloco_anterior["Posto"].iloc[-1]):
+            bloco_anterior = bloco_anterior.iloc[:-1].copy()
+        yield preparar_bloco(bloco_anterior)
+
+
+def ler_csv(arquivo_csv, tamanho_bloco=TAMANHO_BLOCO, colunas=DATA_COLUMNS):
+    blocos = list(ler_csv_em_blocos(arquivo_csv, tamanho_bloco, colunas))
+
+    if not blocos:
+        import pandas as pd
+        return pd.DataFrame(columns=colunas)
+
+    return concatenar_blocos(blocos)
+
+
+def ler_csv_pandas(arquivo_csv):
+    return ler_csv(arquivo_csv).sort_values(by='Posto', kind='stable')
+
+
+def separar_campos(linha, ultimo, codificacao):
+    if b'"' in linha:
+        # campo entre aspas pode conter ';': só essas linhas passam pelo módulo csv
+        return [campo.encode(codificacao) for campo in next(csv.reader([linha.decode(codificacao)], delimiter=';'))]
+    return linha.split(b';', ultimo)
+
+
+def ler_csv_bytes(arquivo_csv, colunas=DATA_COLUMNS):
+    codificacao = detectar_codificacao(arquivo_csv)
+    arquivo = arquivo_csv if hasattr(arquivo_csv, "read") else open(arquivo_csv, "rb")
 
+    with arquivo:
+        cabecalho = [coluna.strip().decode(codificacao) for coluna in arquivo.readline().split(b';')]
+        indices = [cabecalho.index(coluna) for coluna in colunas]
+        ultimo = max(indices) + 1
+        linhas = []
 
-def ler_csv(arquivo_csv):
-    data_columns = ["Posto", "Ocupação", "Qtd. Vagas Disponíveis", "Município Local de Trabalho", "Forma de Contratação", "Salário", "Frequência de Pagamento", "Escolaridade", "Tempo de Experiência", "Aceita Deficientes"]
-    csv_files = [file for file in os.listdir() if file.endswith(".csv")]
-    dfs = []
+        # a maior parte de cada linha é preenchimento: só os campos usados são aparados e decodificados
+        for linha in arquivo:
+            campos = separar_campos(linha, ultimo, codificacao)
+            if len(campos) < ultimo:
+                continue
+            linhas.append([campos[indice].rstrip().decode(codificacao) for indice in indices])
 
-    for csv_file in csv_files:
-        df = pd.read_csv(csv_file, sep=';', usecols=data_columns, encoding='latin1')
-        df = df.iloc[:-1] 
-        dfs.append(df)
+    if "Posto" in colunas and linhas and eh_rodape(linhas[-1][colunas.index("Posto")]):
+        linhas.pop()
+    linhas.sort(key=lambda linha: linha[0])
+    return linhas
 
-    return dfs
 
+class ColunaMapeada:
+    __slots__ = ("mapa", "inicios", "fins", "codificacao", "extras")
 
+    def __init__(self, mapa, inicios, fins, codificacao=CODIFICACAO_PADRAO, extras=b""):
+        self.mapa = mapa
+        self.inicios = inicios
+        self.fins = fins
+        self.codificacao = codificacao
+        self.extras = extras
+
+    def __len__(self):
+        return len(self.inicios)
+
+    def bruto(self, inicio, fim):
+        # posições além do fim do arquivo apontam para os campos das linhas com aspas
+        if inicio < len(self.mapa):
+            return self.mapa[inicio:fim]
+        return self.extras[inicio - len(self.mapa):fim - len(self.mapa)]
+
+    def __getitem__(self, indice):
+        return self.bruto(self.inicios[indice], self.fins[indice]).rstrip().decode(self.codificacao)
+
+    def brutos(self):
+        if not self.extras:
+            return map(self.mapa.__getitem__, map(slice, self.inicios.tolist(), self.fins.tolist()))
+        return map(self.bruto, self.inicios.tolist(), self.fins.tolist())
+
+
+class TabelaMapeada:
+    def __init__(self, mapa, colunas, inicios, fins, codificacao=CODIFICACAO_PADRAO, extras=b""):
+        self.mapa = mapa
+        self.colunas = colunas
+        self.inicios = inicios
+        self.fins = fins
+        self.codificacao = codificacao
+        self.extras = extras
+
+    def __len__(self):
+        return len(self.inicios)
+
+    def __getitem__(self, nome):
+        coluna = self.colunas.index(nome)
+        return ColunaMapeada(self.mapa, self.inicios[:, coluna], self.fins[:, coluna], self.codificacao, self.extras)
+
+    def reordenar(self, ordem):
+        return TabelaMapeada(self.mapa, self.colunas, self.inicios[ordem], self.fins[ordem], self.codificacao, self.extras)
+
+
+def mapear_arquivo(arquivo_csv):
+    import mmap
+
+    if hasattr(arquivo_csv, "read"):
+        return arquivo_csv.read()
+
+    with open(arquivo_csv, "rb") as arquivo:
+        if os.fstat(arquivo.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def indexar_campos(mapa, inicio, fim, indices):
+    import numpy as np
+
+    bloco = np.frombuffer(mapa, dtype=np.uint8, count=fim - inicio, offset=inicio)
+    separadores = np.flatnonzero(bloco == ord(';'))
+    fins_linha = np.flatnonzero(bloco == ord('\n'))
+    if len(fins_linha) == 0 or fins_linha[-1] != len(bloco) - 1:
+        fins_linha = np.append(fins_linha, len(bloco))
+    inicios_linha = np.concatenate(([0], fins_linha[:-1] + 1))
+
+    # linhas com aspas podem ter ';' dentro de um campo: ficam de fora e são separadas pelo módulo csv
+    aspas = np.flatnonzero(bloco == ord('"'))
+    com_aspas = np.searchsorted(aspas, inicios_linha) != np.searchsorted(aspas, fins_linha)
+    linhas_com_aspas = list(zip((inicios_linha[com_aspas] + inicio).tolist(), (fins_linha[com_aspas] + inicio + 1).tolist()))
+
+    # cada linha usa os separadores entre o seu início e o seu fim; linhas em branco não têm nenhum
+    primeiro = np.searchsorted(separadores, inicios_linha)
+    completas = (np.searchsorted(separadores, fins_linha) - primeiro >= max(indices) + 1) & ~com_aspas
+    primeiro = primeiro[completas, None]
+    inicios_linha = inicios_linha[completas, None]
+
+    indices = np.asarray(indices)
+    fins = separadores[primeiro + indices]
+    inicios = np.where(indices == 0, inicios_linha, separadores[primeiro + indices - 1] + 1)
+    return inicios + inicio, fins + inicio, linhas_com_aspas
+
+
+def incluir_linhas_com_aspas(mapa, inicios, fins, linhas, indices, codificacao):
+    import numpy as np
+
+    # os campos dessas linhas não são fatias do arquivo: vão, já separados, para um buffer depois do fim dele
+    ultimo = max(indices) + 1
+    extras = bytearray()
+    posicoes = []
+    novos_inicios = []
+    novos_fins = []
+
+    for inicio_linha, fim_linha in linhas:
+        campos = separar_campos(mapa[inicio_linha:fim_linha], ultimo, codificacao)
+        if len(campos) < ultimo:
+            continue
+        posicoes.append(inicio_linha)
+        for indice in indices:
+            novos_inicios.append(len(mapa) + len(extras))
+            extras += campos[indice]
+            novos_fins.append(len(mapa) + len(extras))
+
+    # intercala as linhas com aspas com as demais na ordem em que aparecem no arquivo
+    ordem = np.argsort(np.concatenate([inicios[:, 0], np.array(posicoes, dtype=np.int64)]), kind="stable")
+    inicios = np.concatenate([inicios, np.array(novos_inicios, dtype=np.int64).reshape(-1, len(indices))])[ordem]
+    fins = np.concatenate([fins, np.array(novos_fins, dtype=np.int64).reshape(-1, len(indices))])[ordem]
+    return inicios, fins, bytes(extras)
+
+
+def ler_csv_mmap(arquivo_csv, colunas=DATA_COLUMNS, tamanho_bloco=BLOCO_MAPEAMENTO):
+    import numpy as np
+
+    codificacao = detectar_codificacao(arquivo_csv)
+    mapa = mapear_arquivo(arquivo_csv)
+
+    fim_cabecalho = mapa.find(b'\n')
+    fim_cabecalho = len(mapa) if fim_cabecalho == -1 else fim_cabecalho
+    cabecalho = [coluna.strip().decode(codificacao) for coluna in mapa[:fim_cabecalho].split(b';')]
+    indices = [cabecalho.index(coluna) for coluna in colunas]
+
+    # indexa as posições dos campos em blocos terminados em quebra de linha, sem copiar as linhas para strings
+    blocos = []
+    linhas_com_aspas = []
+    posicao = fim_cabecalho + 1
+    while posicao < len(mapa):
+        limite = mapa.find(b'\n', min(posicao + tamanho_bloco, len(mapa)) - 1)
+        limite = len(mapa) if limite == -1 else limite + 1
+        inicios, fins, com_aspas = indexar_campos(mapa, posicao, limite, indices)
+        blocos.append((inicios, fins))
+        linhas_com_aspas.extend(com_aspas)
+        posicao = limite
+
+    inicios = np.concatenate([inicios for inicios, _ in blocos]) if blocos else np.empty((0, len(colunas)), dtype=np.int64)
+    fins = np.concatenate([fins for _, fins in blocos]) if blocos else np.empty((0, len(colunas)), dtype=np.int64)
+    extras = b""
+    if linhas_com_aspas:
+        inicios, fins, extras = incluir_linhas_com_aspas(mapa, inicios, fins, linhas_com_aspas, indices, codificacao)
+
+    tabela = TabelaMapeada(mapa, list(colunas), inicios, fins, codificacao, extras)
+    if "Posto" in colunas and len(tabela) and eh_rodape(tabela["Posto"][len(tabela) - 1]):
+        tabela = TabelaMapeada(mapa, list(colunas), inicios[:-1], fins[:-1], codificacao, extras)
+    valores, codigos = formatar_mapeados(str, tabela[colunas[0]])
+    postos = list(map(valores.__getitem__, codigos))
+    return tabela.reordenar(sorted(range(len(postos)), key=postos.__getitem__))
+
+
+LEITORES = {"bytes": ler_csv_bytes, "mmap": ler_csv_mmap, "pandas": ler_csv_pandas}
+
+
+def escolher_leitor(leitor, tamanho):
+    if leitor == "auto":
+        leitor = "bytes" if tamanho <= LIMITE_LEITURA_SIMPLES else "mmap"
+    return LEITORES[leitor]
+
+
+TAMANHO_CACHE_FORMATOS = 4096
+
+ABREVIACOES_POSTO = {
+    "Cabo de Santo Agostinho" : "Cabo de Santo A.",
+    "Nazare da Mata" : "Nazaré da Mata",
+    "Igarassu" : "Igarassu",
+    "Vitoria de Santo Antao" : "Vitória de S. Antão",
+    "Santa Cruz do Capibaribe" : "Santa Cruz do C.",
+    "Sao Lourenco da Mata" : "São L. da Mata"
+}
+
+CABECALHO = ["Agência", "Vagas", "Descrição", "Local de Trabalho", "Contrato", "Salário", "Escolaridade", "Experiência"]
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_FORMATOS)
 def limitar_texto(texto, limite):
     return texto[:35]
 
 
+@lru_cache(maxsize=TAMANHO_CACHE_FORMATOS)
 def formatar_posto(posto):
     posto = posto.replace('Sine', '').strip()
     if posto.endswith('/Pe'):
         posto = posto[:-3].strip()
     return posto
 
+@lru_cache(maxsize=TAMANHO_CACHE_FORMATOS)
 def abreviar_posto(posto):
-    abreviacoes = {
-        "Cabo de Santo Agostinho" : "Cabo de Santo A.",
-        "Nazare da Mata" : "Nazaré da Mata",
-        "Igarassu" : "Igarassu",
-        "Vitoria de Santo Antao" : "Vitória de S. Antão",
-        "Santa Cruz do Capibaribe" : "Santa Cruz do C.",
-        "Sao Lourenco da Mata" : "São L. da Mata"
-    }
-    return abreviacoes.get(posto, posto).replace('Sine', '').strip()
+    return ABREVIACOES_POSTO.get(posto, posto).replace('Sine', '').strip()
 
 
+@lru_cache(maxsize=TAMANHO_CACHE_FORMATOS)
 def formatar_municipio(municipio):
     return limitar_texto(municipio.replace("PE-", ""), 30)
 
+@lru_cache(maxsize=TAMANHO_CACHE_FORMATOS)
 def formatar_escolaridade(valor):
     valor = valor.replace(" Completo", "").replace(" Incompleto", " Não C.")
     return valor
 
 
+@lru_cache(maxsize=TAMANHO_CACHE_FORMATOS)
 def formatar_experiencia(valor):
     try:
         valor_inteiro = int(float(valor)) 
@@ -59,8 +419,249 @@ def formatar_experiencia(valor):
             return f"{valor_inteiro} Meses"
     except ValueError:
         return "Não Exigida"
-    
-    
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_FORMATOS)
+def formatar_salario(salario, frequencia):
+    salario = salario.replace(".", "").replace(",", ".") 
+    salario_float = float(salario)
+    salario_redondo = round(salario_float)
+
+    if salario_float == 0.0:
+        return "Não informado"
+    elif salario_float >= 100.0:
+        return f"R$ {salario_redondo} / {frequencia}"
+    else:
+        return f"R$ {salario_float} / {frequencia}"
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_FORMATOS)
+def formatar_contrato(forma_contratacao, aceita_deficientes):
+    if "Exclusivamente deficiente" in aceita_deficientes and forma_contratacao != "Aceita deficiente":
+        return "Exclusivo PCD"
+    return forma_contratacao
+
+
+def formatar_agencia(posto):
+    return abreviar_posto(formatar_posto(posto))
+
+
+def formatar_descricao(ocupacao):
+    return limitar_texto(str(ocupacao), 35)
+
+
+FORMATADORES = [limitar_texto, formatar_posto, abreviar_posto, formatar_municipio, formatar_escolaridade, formatar_experiencia, formatar_salario, formatar_contrato]
+
+
+def estatisticas_cache(desde=None):
+    estatisticas = {formatador.__name__: formatador.cache_info()._asdict() for formatador in FORMATADORES}
+    if desde is not None:
+        # acertos e falhas contados só a partir do retrato anterior, mesmo num processo reaproveitado
+        for nome, info in estatisticas.items():
+            info["hits"] -= desde[nome]["hits"]
+            info["misses"] -= desde[nome]["misses"]
+    return estatisticas
+
+
+def limpar_cache():
+    for formatador in FORMATADORES:
+        formatador.cache_clear()
+
+
+def formatar_unicos(formatador, *colunas):
+    import pandas as pd
+
+    if len(colunas) == 1:
+        codigos, unicos = pd.factorize(colunas[0], use_na_sentinel=False)
+        argumentos = [(valor,) for valor in unicos]
+    else:
+        codigos, unicos = pd.MultiIndex.from_arrays(colunas).factorize()
+        argumentos = list(unicos)
+
+    formatados = pd.Series([formatador(*valores) for valores in argumentos], dtype=object)
+    codigos_formatados, categorias = pd.factorize(formatados)
+
+    return pd.Series(pd.Categorical.from_codes(codigos_formatados[codigos], categorias), index=colunas[0].index)
+
+
+def normalizar_dados(dados):
+    import pandas as pd
+
+    return pd.DataFrame({
+        "Agência": formatar_unicos(formatar_agencia, dados["Posto"]),
+        "Vagas": dados["Qtd. Vagas Disponíveis"],
+        "Descrição": formatar_unicos(formatar_descricao, dados["Ocupação"]),
+        "Local de Trabalho": formatar_unicos(formatar_municipio, dados["Município Local de Trabalho"]),
+        "Contrato": formatar_unicos(formatar_contrato, dados["Forma de Contratação"], dados["Aceita Deficientes"]),
+        "Salário": formatar_unicos(formatar_salario, dados["Salário"], dados["Frequência de Pagamento"]),
+        "Escolaridade": formatar_unicos(formatar_escolaridade, dados["Escolaridade"]),
+        "Experiência": formatar_unicos(formatar_experiencia, dados["Tempo de Experiência"]),
+    }, columns=CABECALHO)
+
+
+def formatar_valores(formatador, linhas, *indices):
+    # cada combinação distinta de campos é formatada uma vez só; as linhas guardam apenas o código dela
+    codigos_por_chave = {}
+    codigos = array("i", [codigos_por_chave.setdefault(chave, len(codigos_por_chave)) for chave in map(itemgetter(*indices), linhas)])
+    if len(indices) == 1:
+        return [formatador(chave) for chave in codigos_por_chave], codigos
+    return [formatador(*chave) for chave in codigos_por_chave], codigos
+
+
+def normalizar_linhas(linhas):
+    indice = {coluna: posicao for posicao, coluna in enumerate(DATA_COLUMNS)}
+    return TabelaVagas([
+        formatar_valores(formatar_agencia, linhas, indice["Posto"]),
+        formatar_valores(converter_vagas, linhas, indice["Qtd. Vagas Disponíveis"]),
+        formatar_valores(formatar_descricao, linhas, indice["Ocupação"]),
+        formatar_valores(formatar_municipio, linhas, indice["Município Local de Trabalho"]),
+        formatar_valores(formatar_contrato, linhas, indice["Forma de Contratação"], indice["Aceita Deficientes"]),
+        formatar_valores(formatar_salario, linhas, indice["Salário"], indice["Frequência de Pagamento"]),
+        formatar_valores(formatar_escolaridade, linhas, indice["Escolaridade"]),
+        formatar_valores(formatar_experiencia, linhas, indice["Tempo de Experiência"]),
+    ])
+
+
+def formatar_mapeados(formatador, *colunas):
+    # os campos são decodificados só na primeira vez em que cada valor aparece
+    codigos_por_bruto = {}
+    valores = []
+    codigos = array("i")
+    codificacao = colunas[0].codificacao
+    brutos = colunas[0].brutos() if len(colunas) == 1 else zip(*(coluna.brutos() for coluna in colunas))
+
+    for chave in brutos:
+        codigo = codigos_por_bruto.get(chave)
+        if codigo is None:
+            codigo = codigos_por_bruto[chave] = len(valores)
+            if len(colunas) == 1:
+                valores.append(formatador(chave.rstrip().decode(codificacao)))
+            else:
+                valores.append(formatador(*(bruto.rstrip().decode(codificacao) for bruto in chave)))
+        codigos.append(codigo)
+    return valores, codigos
+
+
+def normalizar_mapeados(dados):
+    return TabelaVagas([
+        formatar_mapeados(formatar_agencia, dados["Posto"]),
+        formatar_mapeados(converter_vagas, dados["Qtd. Vagas Disponíveis"]),
+        formatar_mapeados(formatar_descricao, dados["Ocupação"]),
+        formatar_mapeados(formatar_municipio, dados["Município Local de Trabalho"]),
+        formatar_mapeados(formatar_contrato, dados["Forma de Contratação"], dados["Aceita Deficientes"]),
+        formatar_mapeados(formatar_salario, dados["Salário"], dados["Frequência de Pagamento"]),
+        formatar_mapeados(formatar_escolaridade, dados["Escolaridade"]),
+        formatar_mapeados(formatar_experiencia, dados["Tempo de Experiência"]),
+    ])
+
+
+def normalizar(dados):
+    if isinstance(dados, list):
+        return normalizar_linhas(dados)
+    if isinstance(dados, TabelaMapeada):
+        return normalizar_mapeados(dados)
+    return normalizar_dados(dados)
+
+
+class TabelaVagas:
+    def __init__(self, colunas):
+        self.valores = [valores for valores, _ in colunas]
+        self.codigos = [codigos for _, codigos in colunas]
+
+    def __len__(self):
+        return len(self.codigos[0])
+
+    def classificar(self, indice, chave=None):
+        # posição de cada linha na ordem dos valores distintos da coluna; valores iguais ficam na mesma posição
+        valores = list(self.valores[indice])
+        codigos = self.codigos[indice].tolist()
+        chaves = {codigo: valores[codigo] if chave is None else chave(valores[codigo]) for codigo in set(codigos)}
+        posicoes = {valor: posicao for posicao, valor in enumerate(sorted(set(chaves.values())))}
+        posicoes = {codigo: posicoes[valor] for codigo, valor in chaves.items()}
+        return list(map(posicoes.__getitem__, codigos))
+
+    def linhas(self, ordem=None):
+        return [LinhaVaga(self, indice) for indice in (range(len(self)) if ordem is None else ordem)]
+
+
+def tabela_do_dataframe(normalizados):
+    import numpy as np
+    import pandas as pd
+
+    colunas = []
+    for coluna in CABECALHO:
+        serie = normalizados[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            colunas.append((np.append(serie.cat.categories.to_numpy(dtype=object), np.nan), serie.cat.codes.to_numpy()))
+        else:
+            codigos, valores = pd.factorize(serie, use_na_sentinel=False)
+            colunas.append((np.asarray(valores, dtype=object), codigos))
+    return TabelaVagas(colunas)
+
+
+def tabela_das_linhas(linhas):
+    # as linhas de uma tabela viram outra só com os códigos delas, pequena o bastante para ir a outro processo
+    if not linhas:
+        return TabelaVagas([([], array("i"))] * len(CABECALHO))
+
+    tabela = linhas[0].tabela
+    indices = [linha.indice for linha in linhas]
+    if "numpy" in sys.modules:
+        import numpy as np
+
+        indices = np.asarray(indices)
+        return TabelaVagas([(valores, np.asarray(codigos)[indices]) for valores, codigos in zip(tabela.valores, tabela.codigos)])
+    return TabelaVagas([(valores, array("i", map(codigos.__getitem__, indices))) for valores, codigos in zip(tabela.valores, tabela.codigos)])
+
+
+def tabela_para_contagem(linhas):
+    # contagens não dependem da ordem: com todas as linhas da tabela, conta direto nela
+    if linhas and len(linhas) == len(linhas[0].tabela):
+        return linhas[0].tabela
+    return tabela_das_linhas(linhas)
+
+
+def recortar_linhas(linhas):
+    return tabela_das_linhas(linhas).linhas()
+
+
+def contar_combinacoes(*colunas):
+    # quantas linhas têm cada combinação de códigos, sem passar pelas linhas uma a uma em Python
+    if "numpy" not in sys.modules:
+        return Counter(zip(*colunas))
+
+    import numpy as np
+
+    codigos = [np.asarray(coluna, dtype=np.int64) for coluna in colunas]
+    if not codigos[0].size:
+        return {}
+    tamanhos = tuple(int(coluna.max()) + 1 for coluna in codigos)
+    contagem = np.bincount(np.ravel_multi_index(codigos, tamanhos))
+    presentes = np.flatnonzero(contagem)
+    return dict(zip(zip(*(posicoes.tolist() for posicoes in np.unravel_index(presentes, tamanhos))), contagem[presentes].tolist()))
+
+
+class LinhaVaga:
+    __slots__ = ("tabela", "indice")
+
+    def __init__(self, tabela, indice):
+        self.tabela = tabela
+        self.indice = indice
+
+    def __len__(self):
+        return len(CABECALHO) + 2
+
+    def __getitem__(self, coluna):
+        if coluna >= len(CABECALHO):
+            return None
+
+        return self.tabela.valores[coluna][self.tabela.codigos[coluna][self.indice]]
+
+    def __iter__(self):
+        for coluna in range(len(self)):
+            yield self[coluna]
+
+
 def traduzir_mes(mes_numero):
     meses = {
         1: 'Janeiro',
@@ -92,50 +693,63 @@ def obter_data_em_portugues():
     return data_texto
 
 
-def criar_pdf(dados, nome_pdf):
-    global total_vagas
-    global data_texto
-    doc = SimpleDocTemplate(nome_pdf, pagesize=landscape(letter), rightMargin=30, leftMargin=30, topMargin=5, bottomMargin=20)
-    table_data = (dados.values.tolist())
-    Table(table_data)
+COL_WIDTHS = [90, 40, 190, 135, 75, 80, 100, 65, 0]
+ROW_HEIGHT = 25
+IMG_PATH = "governo-copia.png"
+ESCALA_LOGO = 2
+PAGINAS_POR_FRAGMENTO = 20
+VERSAO_GERADOR = "3.5"
+ARQUIVO_MANIFESTO = "manifesto.json"
+PASTA_CACHE = "cache"
+TAMANHO_CACHE_MB = 512
 
-    col_widths = [90, 40, 190, 135, 75, 80, 100, 65, 0]  
-    row_height = 25
 
-    for index, row in enumerate(table_data):
-        row[0] = formatar_posto(row[0])
-        row[0] = abreviar_posto(row[0])
-        row[2] = limitar_texto(str(row[2]), 35)
-        row[3] = formatar_municipio(row[3])
+def criar_documento(nome_pdf):
+    from reportlab.lib.pagesizes import landscape, letter
+    from reportlab.platypus import SimpleDocTemplate
 
-        salario = row[5]
-        frequencia = row[6]
+    return SimpleDocTemplate(nome_pdf, pagesize=landscape(letter), rightMargin=30, leftMargin=30, topMargin=5, bottomMargin=20)
 
-        salario = salario.replace(".", "").replace(",", ".") 
-        salario_float = float(salario)
-        salario_redondo = round(salario_float)
 
-        if salario_float == 0.0:
-            salario_frequencia = "Não informado"
-        elif salario_float >= 100.0:
-            salario_frequencia = f"R$ {salario_redondo} / {frequencia}"
-        else:
-            salario_frequencia = f"R$ {salario_float} / {frequencia}"
+@lru_cache(maxsize=8)
+def decodificar_logo(caminho, modificado_em, largura, altura):
+    from PIL import Image as PILImage
+    from reportlab.lib.utils import ImageReader
+
+    with PILImage.open(caminho) as imagem:
+        imagem.load()
+        return ImageReader(imagem.resize((largura * ESCALA_LOGO, altura * ESCALA_LOGO), PILImage.LANCZOS))
+
+
+def carregar_logo(caminho=IMG_PATH, largura=400, altura=80):
+    return decodificar_logo(caminho, os.stat(caminho).st_mtime_ns, largura, altura)
 
-        row[5] = salario_frequencia
-        row[6] = formatar_escolaridade(row[7])
-        row[7] = formatar_experiencia(row[8])
-        row[8] = None
 
-        if "Exclusivamente deficiente" in row[9] :
-            if row[4] != "Aceita deficiente":
-                forma_contratacao_aceita_deficientes = "Exclusivo PCD"
-                row[4] = forma_contratacao_aceita_deficientes
+@dataclass(frozen=True)
+class ModeloRelatorio:
+    obs_style: ParagraphStyle
+    vazio_style: ParagraphStyle
+    legenda_style: ParagraphStyle
+    title_style: ParagraphStyle
+    tabela_style: TableStyle
+    cabecalho: tuple
+    col_widths: tuple
+    row_height: int
+    logo: ImageReader
+    legenda: tuple
 
-        row[8] = None
-        row[9] = None
+    def criar_logo(self):
+        from reportlab.platypus import Image
 
-    table_part = Table(table_data, colWidths=col_widths, rowHeights=row_height, repeatRows=1)
+        img = Image(IMG_PATH, width=400, height=80)
+        img._img = self.logo
+        return img
+
+
+def compilar_modelo():
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import TableStyle
 
     obs_style = getSampleStyleSheet()["Heading1"]
     obs_style.fontName = 'Helvetica-Bold'
@@ -166,121 +780,1133 @@ def criar_pdf(dados, nome_pdf):
                 ('FONTSIZE', (0, 0), (-1, 0), title_style.fontSize),
             ])
 
-    table_parts = []
-    max_rows_per_page = 15
+    return ModeloRelatorio(
+        obs_style=obs_style,
+        vazio_style=vazio_style,
+        legenda_style=legenda_style,
+        title_style=title_style,
+        tabela_style=style,
+        cabecalho=tuple(CABECALHO),
+        col_widths=tuple(COL_WIDTHS),
+        row_height=ROW_HEIGHT,
+        logo=carregar_logo(IMG_PATH),
+        legenda=("Exclusivo PCD = Exclusivo para Pessoa com Deficiência", "Não C. = Não Completo"),
+    )
+
+
+@lru_cache(maxsize=1)
+def obter_modelo():
+    return compilar_modelo()
+
+
+def aquecer_processo():
+    obter_modelo()
 
-    table_data.sort(key=lambda x: (x[0][0].upper(), x[0], x[4])) 
 
+def criar_pool(workers):
+    return ProcessPoolExecutor(max_workers=workers, initializer=aquecer_processo)
+
+
+def ordenar_tabela(normalizados):
+    tabela = normalizados if isinstance(normalizados, TabelaVagas) else tabela_do_dataframe(normalizados)
+    agencias = tabela.classificar(0, lambda agencia: (agencia[0].upper(), agencia))
+    contratos = tabela.classificar(4)
+    ordem = sorted(range(len(tabela)), key=list(zip(agencias, contratos)).__getitem__)
+    return tabela.linhas(ordem)
+
+
+def preparar_tabela(dados, perfil=None):
+    with medir_etapa(perfil, "normalizacao"):
+        normalizados = normalizar(dados)
+    with medir_etapa(perfil, "ordenacao"):
+        return ordenar_tabela(normalizados)
+
+
+def agrupar_por_posto(table_data):
     grupos = {}
     for row in table_data:
         posto = row[0]
         if posto not in grupos:
             grupos[posto] = []
         grupos[posto].append(row)
+    return grupos
 
-    img_path = "governo-copia.png"
-    img = Image(img_path, width=400, height=80)
-    data_line = Paragraph("Vagas a serem publicadas para o dia: " + data_texto, obs_style)
-    obs_line = Paragraph("Obs: Vagas sujeitas a alterações no decorrer do dia.", obs_style)
-    
-    table_parts.append(img)
-    table_parts.append(data_line)
-    table_parts.append(obs_line)
-
-    
-    table_todas_as_vagas = Table([["Agência", "Vagas", "Descrição", "Local de Trabalho", "Contrato", "Salário", "Escolaridade", "Experiência"]] +
-                                    [[str(item) for item in row] for row in table_data],
-            colWidths=col_widths, rowHeights=row_height, repeatRows=0)
-    table_todas_as_vagas.setStyle(style)
-        
-    table_parts.append(table_todas_as_vagas)
 
-    for posto, grupo_data in grupos.items():
-        add_row = []
+def formatar_celulas(linhas):
+    return [[str(item) for item in row] for row in linhas]
 
-        vagas_por_contratacao = {}
-        vagas_exclusivas_pcd = []
-        
-        for row in grupo_data: 
-            forma_contratacao = row[4]
 
-            if forma_contratacao != "Exclusivo PCD":
-                if forma_contratacao not in vagas_por_contratacao:
-                    vagas_por_contratacao[forma_contratacao] = []
+def montar_cabecalho(modelo, data_texto):
+    from reportlab.platypus import Paragraph
 
-                vagas_por_contratacao[forma_contratacao].append(row)
+    img = modelo.criar_logo()
+    data_line = Paragraph("Vagas a serem publicadas para o dia: " + data_texto, modelo.obs_style)
+    obs_line = Paragraph("Obs: Vagas sujeitas a alterações no decorrer do dia.", modelo.obs_style)
+    return img, data_line, obs_line
 
-        grouped_rows = []
 
-        for forma_contratacao, vagas in vagas_por_contratacao.items():
-            if forma_contratacao != "Exclusivo PCD":
-                grouped_rows.extend(vagas)
-        
-        add_row.extend(grouped_rows)
+def montar_tabela(celulas, modelo):
+    from reportlab.platypus import Table
 
-        vagas_exclusivas_pcd = [row for row in table_data if row[4] == "Exclusivo PCD"]
+    tabela = Table([list(modelo.cabecalho)] + celulas, colWidths=list(modelo.col_widths), rowHeights=modelo.row_height, repeatRows=0)
+    tabela.setStyle(modelo.tabela_style)
+    return tabela
+
+
+def linhas_por_pagina(doc):
+    return int((doc.height - 12) // obter_modelo().row_height) - 1
+
+
+def linhas_na_primeira_pagina(doc, cabecalho):
+    disponivel = doc.height - 12
+
+    for indice, flowable in enumerate(cabecalho):
+        _, altura = flowable.wrap(doc.width - 12, disponivel)
+        if indice:
+            disponivel -= flowable.getSpaceBefore()
+        disponivel -= altura + flowable.getSpaceAfter()
+
+    return int(disponivel // obter_modelo().row_height) - 1
+
+
+@lru_cache(maxsize=1)
+def classe_pagina_tabela():
+    from reportlab.platypus import Flowable
+
+    class PaginaTabela(Flowable):
+        # as células da página só viram strings quando ela é diagramada e são descartadas depois de desenhadas
+        def __init__(self, linhas, modelo):
+            super().__init__()
+            self.linhas = linhas
+            self.modelo = modelo
+            self.tabela = None
+
+        def montar(self):
+            if self.tabela is None:
+                self.tabela = montar_tabela(formatar_celulas(self.linhas), self.modelo)
+            return self.tabela
+
+        def wrap(self, largura, altura):
+            return self.montar().wrap(largura, altura)
+
+        def split(self, largura, altura):
+            return self.montar().split(largura, altura)
+
+        def drawOn(self, canvas, x, y, _sW=0):
+            self.montar().drawOn(canvas, x, y, _sW)
+            self.tabela = None
+
+    return PaginaTabela
+
+
+def paginar_tabela(linhas, modelo, linhas_primeira_pagina, linhas_demais_paginas):
+    PaginaTabela = classe_pagina_tabela()
+    tabelas = []
+    inicio = 0
+    capacidade = max(linhas_primeira_pagina, 1)
+
+    while inicio < len(linhas) or not tabelas:
+        tabelas.append(PaginaTabela(linhas[inicio:inicio + capacidade], modelo))
+        inicio += capacidade
+        capacidade = max(linhas_demais_paginas, 1)
+
+    return tabelas
+
+
+def montar_secao_pcd(linhas_pcd, modelo, img, obs_line, doc):
+    from reportlab.platypus import Paragraph, PageBreak, Spacer
+
+    cabecalho = [
+        img,
+        Paragraph("Vagas Exclusivas para PCD:", modelo.obs_style),
+        obs_line,
+        Spacer(1, 6),
+    ]
+    tabelas = paginar_tabela(linhas_pcd, modelo, linhas_na_primeira_pagina(doc, cabecalho), linhas_por_pagina(doc))
+    return [PageBreak()] + cabecalho + tabelas
+
+
+def vagas_dos_valores(valores):
+    vagas = []
+    for valor in valores:
+        try:
+            vagas.append(int(valor))
+        except (TypeError, ValueError):
+            vagas.append(0)
+    return vagas
+
+
+def contar_vagas(table_data):
+    tabela = tabela_para_contagem(table_data)
+    vagas = vagas_dos_valores(tabela.valores[1])
+    return sum(quantidade * vagas[codigo] for (codigo,), quantidade in contar_combinacoes(tabela.codigos[1]).items())
+
+
+DIMENSOES_ESTATISTICAS = [("agencia", "Agência", 0), ("municipio", "Local de Trabalho", 3), ("contrato", "Contrato", 4), ("escolaridade", "Escolaridade", 6)]
+
+
+def ordenar_totais(totais):
+    return dict(sorted(totais.items(), key=lambda item: (-item[1], item[0])))
+
+
+def somar_vagas(valores, contagem, vagas):
+    totais = {}
+    for (codigo, codigo_vagas), quantidade in contagem.items():
+        totais[valores[codigo]] = totais.get(valores[codigo], 0) + quantidade * vagas[codigo_vagas]
+    return totais
+
+
+def calcular_estatisticas(table_data):
+    # soma por código: cada combinação distinta de valor e vagas é convertida e somada uma vez só
+    tabela = tabela_para_contagem(table_data)
+    vagas = vagas_dos_valores(tabela.valores[1])
+    codigos_vagas = tabela.codigos[1]
+    totais = {dimensao: somar_vagas(tabela.valores[coluna], contar_combinacoes(tabela.codigos[coluna], codigos_vagas), vagas) for dimensao, _, coluna in DIMENSOES_ESTATISTICAS}
+
+    contratos = tabela.valores[4]
+    pcd = {(agencia, codigo_vagas): quantidade for (agencia, contrato, codigo_vagas), quantidade in contar_combinacoes(tabela.codigos[0], tabela.codigos[4], codigos_vagas).items() if contratos[contrato] == "Exclusivo PCD"}
+    pcd_por_agencia = somar_vagas(tabela.valores[0], pcd, vagas)
+
+    estatisticas = {
+        "total_vagas": sum(totais["agencia"].values()),
+        "total_linhas": len(table_data),
+        "vagas_exclusivas_pcd": sum(pcd_por_agencia.values()),
+    }
+    for dimensao, _, _ in DIMENSOES_ESTATISTICAS:
+        estatisticas[dimensao] = ordenar_totais(totais[dimensao])
+    estatisticas["pcd_por_agencia"] = ordenar_totais(pcd_por_agencia)
+    return estatisticas
+
+
+def tabela_totais(rotulo, totais, total_vagas, modelo):
+    from reportlab.platypus import Table
+
+    linhas = [[rotulo, "Vagas", "%"]] + [[valor, vagas, f"{100 * vagas / total_vagas:.1f}" if total_vagas else "-"] for valor, vagas in totais.items()]
+    tabela = Table(linhas, colWidths=[300, 80, 80], rowHeights=modelo.row_height, repeatRows=1, hAlign="LEFT")
+    tabela.setStyle(modelo.tabela_style)
+    return tabela
 
-    if vagas_exclusivas_pcd:
-        if table_parts:
-            table_parts.append(PageBreak())
 
-        table_exclusivo_pcd = Table([["Agência", "Vagas", "Descrição", "Local de Trabalho", "Contrato", "Salário", "Escolaridade", "Experiência"]] +
-                                    [[str(item) for item in row] for row in vagas_exclusivas_pcd],
-                                    colWidths=col_widths, rowHeights=row_height, repeatRows=0)
-        table_exclusivo_pcd.setStyle(style)
+def montar_pagina_resumo(estatisticas, modelo):
+    from reportlab.platypus import Paragraph, PageBreak, Spacer
+
+    total_vagas = estatisticas["total_vagas"]
+    partes = [
+        PageBreak(),
+        Paragraph("Resumo das Vagas", modelo.obs_style),
+        Paragraph(f"Total de Vagas: {total_vagas} em {estatisticas['total_linhas']} anúncio(s), {estatisticas['vagas_exclusivas_pcd']} exclusiva(s) para PCD", modelo.title_style),
+        Spacer(1, 12),
+    ]
+    for dimensao, rotulo, _ in DIMENSOES_ESTATISTICAS:
+        partes.extend([tabela_totais(rotulo, estatisticas[dimensao], total_vagas, modelo), Spacer(1, 12)])
+    if estatisticas["pcd_por_agencia"]:
+        partes.extend([Paragraph("Vagas Exclusivas para PCD por Agência:", modelo.legenda_style), Spacer(1, 6)])
+        partes.append(tabela_totais("Agência", estatisticas["pcd_por_agencia"], estatisticas["vagas_exclusivas_pcd"], modelo))
+    return partes
+
+
+def montar_rodape(total_vagas, modelo):
+    from reportlab.platypus import Paragraph
+
+    return [
+        Paragraph ("-", modelo.vazio_style),
+        Paragraph(f"Total de Vagas: {total_vagas}", modelo.obs_style),
+        Paragraph("Legenda:", modelo.legenda_style),
+    ] + [Paragraph(linha) for linha in modelo.legenda]
+
+
+def numerar_paginas(pagina_inicial=1):
+    def desenhar_numero(canvas, doc):
+        canvas.saveState()
+        canvas.setFont('Helvetica', 8)
+        canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, 8, f"Página {pagina_inicial + canvas.getPageNumber() - 1}")
+        canvas.restoreState()
+
+    return desenhar_numero
+
+
+def construir_documento(doc, table_parts, pagina_inicial=1):
+    desenhar_numero = numerar_paginas(pagina_inicial)
+    doc.build(table_parts, onFirstPage=desenhar_numero, onLaterPages=desenhar_numero)
+    return doc.page
+
+
+def pico_rss_mb(filhos=False):
+    if resource is None:
+        return None
+
+    pico = resource.getrusage(resource.RUSAGE_CHILDREN if filhos else resource.RUSAGE_SELF).ru_maxrss
+    # o Linux informa em KiB e o macOS em bytes
+    return round(pico / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def cpu_filhos():
+    # só conta processos filhos já encerrados: os pools das etapas são fechados dentro delas
+    if resource is None:
+        return None
+
+    uso = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return uso.ru_utime + uso.ru_stime
+
+
+class PerfilRelatorio:
+    def __init__(self, arquivo_csv):
+        self.arquivo_csv = arquivo_csv
+        self.etapas = []
+        self.linhas = None
+        self.paginas = None
+        self.cache_inicial = estatisticas_cache()
+
+    @contextmanager
+    def etapa(self, nome):
+        inicio = time.perf_counter()
+        inicio_cpu = time.process_time()
+        inicio_cpu_workers = cpu_filhos()
+        try:
+            yield
+        finally:
+            fim_cpu_workers = cpu_filhos()
+            self.etapas.append({
+                "etapa": nome,
+                "tempo": round(time.perf_counter() - inicio, 6),
+                "cpu": round(time.process_time() - inicio_cpu, 6),
+                "cpu_workers": None if fim_cpu_workers is None else round(fim_cpu_workers - inicio_cpu_workers, 6),
+                "pico_rss_processo_mb": pico_rss_mb(),
+                "pico_rss_workers_mb": pico_rss_mb(filhos=True),
+            })
+
+    def como_dict(self):
+        return {
+            "arquivo": self.arquivo_csv,
+            "linhas": self.linhas,
+            "paginas": self.paginas,
+            "tempo_total": round(sum(etapa["tempo"] for etapa in self.etapas), 6),
+            "cpu_total": round(sum(etapa["cpu"] for etapa in self.etapas), 6),
+            "cpu_workers_total": round(sum(etapa["cpu_workers"] or 0 for etapa in self.etapas), 6),
+            "pico_rss_processo_mb": pico_rss_mb(),
+            "pico_rss_workers_mb": pico_rss_mb(filhos=True),
+            "observacao": (
+                "pico_rss_processo_mb é o maior RSS do processo até aquele ponto (ru_maxrss); cada relatório perfilado roda num processo próprio, então o valor não inclui relatórios anteriores. "
+                "cpu e pico_rss_processo_mb cobrem só o processo do relatório; cpu_workers e pico_rss_workers_mb cobrem os workers de fragmentos e agências, "
+                "encerrados ao fim da etapa (pico_rss_workers_mb é o do maior worker, não a soma)"
+            ),
+            "etapas": self.etapas,
+            "cache_formatadores": estatisticas_cache(self.cache_inicial),
+        }
+
+    def salvar(self, destino):
+        with open(destino, "w", encoding="utf-8") as arquivo:
+            json.dump(self.como_dict(), arquivo, indent=2, ensure_ascii=False)
+
+
+def medir_etapa(perfil, nome):
+    return nullcontext() if perfil is None else perfil.etapa(nome)
+
+
+def registrar_contagens(perfil, linhas=None, paginas=None):
+    if perfil is None:
+        return
+
+    if linhas is not None:
+        perfil.linhas = linhas
+    if paginas is not None:
+        perfil.paginas = paginas
+
+
+def criar_pdf(dados, nome_pdf, data_texto=None, perfil=None, table_data=None, resumo=False):
+    if data_texto is None:
+        data_texto = obter_data_em_portugues()
+
+    doc = criar_documento(nome_pdf)
+    modelo = obter_modelo()
+
+    table_parts = []
+
+    if table_data is None:
+        table_data = preparar_tabela(dados, perfil)
+
+    with medir_etapa(perfil, "estatisticas"):
+        estatisticas = calcular_estatisticas(table_data)
+
+    with medir_etapa(perfil, "flowables"):
+        img, data_line, obs_line = montar_cabecalho(modelo, data_texto)
 
         table_parts.append(img)
-        table_parts.append(Paragraph("Vagas Exclusivas para PCD:", obs_style))
+        table_parts.append(data_line)
         table_parts.append(obs_line)
-        table_parts.append(Spacer(1, 6))
-        table_parts.append(table_exclusivo_pcd)
 
-    total_vagas = 0
-    for row in table_data:
+        tabelas_todas_as_vagas = paginar_tabela(table_data, modelo, linhas_na_primeira_pagina(doc, table_parts), linhas_por_pagina(doc))
+        table_parts.extend(tabelas_todas_as_vagas)
+
+        vagas_exclusivas_pcd = [row for row in table_data if row[4] == "Exclusivo PCD"]
+        if vagas_exclusivas_pcd:
+            table_parts.extend(montar_secao_pcd(vagas_exclusivas_pcd, modelo, img, obs_line, doc))
+
+        table_parts.extend(montar_rodape(estatisticas["total_vagas"], modelo))
+
+    if resumo:
+        table_parts.extend(montar_pagina_resumo(estatisticas, modelo))
+
+    with medir_etapa(perfil, "build"):
+        paginas = construir_documento(doc, table_parts)
+
+    registrar_contagens(perfil, len(table_data), paginas)
+    return paginas
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_FORMATOS)
+def codificar_texto_pdf(valor, fonte):
+    from reportlab.pdfbase.pdfmetrics import getFont, unicode2T1
+    from reportlab.pdfgen.canvas import escapePDF
+
+    fonte = getFont(fonte)
+    return tuple((parte.fontName, escapePDF(texto)) for parte, texto in unicode2T1(valor, [fonte] + fonte.substitutionFonts))
+
+
+class PaginaCanvas:
+    def __init__(self, nome_pdf, pagina_inicial=1):
+        from reportlab.lib.pagesizes import landscape, letter
+        from reportlab.pdfgen.canvas import Canvas
+
+        self.largura, self.altura = landscape(letter)
+        self.canvas = Canvas(nome_pdf, pagesize=(self.largura, self.altura))
+        self.x = 30 + 6
+        self.largura_util = self.largura - 60 - 12
+        self.topo = self.altura - 5 - 6
+        self.base = 20 + 6
+        self.y = self.topo
+        self.espaco_anterior = 0
+        self.pagina = pagina_inicial
+        self.paginas = 1
+
+    def no_topo(self):
+        return self.y == self.topo
+
+    def desenhar_numero_pagina(self):
+        self.canvas.saveState()
+        self.canvas.setFont('Helvetica', 8)
+        self.canvas.drawRightString(self.largura - 30, 8, f"Página {self.pagina}")
+        self.canvas.restoreState()
+
+    def nova_pagina(self):
+        self.desenhar_numero_pagina()
+        self.canvas.showPage()
+        self.y = self.topo
+        self.espaco_anterior = 0
+        self.pagina += 1
+        self.paginas += 1
+
+    def adicionar(self, flowable):
+        from reportlab.platypus import PageBreak
+
+        if isinstance(flowable, PageBreak):
+            self.nova_pagina()
+            return
+
+        largura, altura = flowable.wrap(self.largura_util, self.y - self.base)
+        espaco_antes = 0 if self.no_topo() else max(flowable.getSpaceBefore() - self.espaco_anterior, 0)
+        if self.y - espaco_antes - altura < self.base - 1e-6:
+            # como o Frame do platypus: divide o que couber no espaço restante antes de trocar de página
+            partes = flowable.split(self.largura_util, self.y - espaco_antes - self.base)
+            if partes:
+                for parte in partes:
+                    self.adicionar(parte)
+                return
+            if not self.no_topo():
+                self.nova_pagina()
+                espaco_antes = 0
+                largura, altura = flowable.wrap(self.largura_util, self.y - self.base)
+
+        self.y -= espaco_antes + altura
+        flowable.drawOn(self.canvas, self.x, self.y, _sW=self.largura_util - largura)
+        self.espaco_anterior = flowable.getSpaceAfter()
+        self.y -= self.espaco_anterior
+
+    def nome_fonte(self, fonte):
+        return self.canvas._doc.getInternalFontName(fonte)
+
+    def operador_texto(self, valor, fonte):
+        partes = codificar_texto_pdf(valor, fonte)
+        if len(partes) == 1 and partes[0][0] == fonte:
+            return f"({partes[0][1]}) Tj"
+        trocas = " ".join(f"{self.nome_fonte(nome)} 10 Tf ({texto}) Tj" for nome, texto in partes)
+        return f"{trocas} {self.nome_fonte(fonte)} 10 Tf"
+
+    def desenhar_grade(self, linhas, modelo):
+        from reportlab.lib import colors
+        from reportlab.lib.rl_accel import fp_str
+
+        larguras = list(modelo.col_widths)
+        colunas = max(len(linha) for linha in linhas)
+        larguras += [larguras[-1]] * (colunas - len(larguras))
+        largura_tabela = sum(larguras)
+        altura_linha = modelo.row_height
+        x0 = self.x + (self.largura_util - largura_tabela) / 2.0
+        topo = self.y
+        base = topo - len(linhas) * altura_linha
+
+        posicoes = [x0]
+        for largura in larguras:
+            posicoes.append(posicoes[-1] + largura)
+
+        canvas = self.canvas
+        canvas.saveState()
+        canvas.setFillColor(colors.teal)
+        canvas.rect(x0, topo - altura_linha, largura_tabela, altura_linha, stroke=0, fill=1)
+
+        codigo = ["BT"]
+        deslocamentos = [f"{fp_str(largura)} 0 Td " for largura in larguras]
+        for indice, linha in enumerate(linhas):
+            if indice < 2:
+                fonte = modelo.title_style.fontName if indice == 0 else 'Helvetica'
+                cor = colors.whitesmoke if indice == 0 else colors.black
+                codigo.append(f"{self.nome_fonte(fonte)} 10 Tf 12 TL {fp_str(cor.red, cor.green, cor.blue)} rg")
+
+            y = topo - (indice + 1) * altura_linha + (3 + altura_linha - 3 + 12) / 2.0 - 10
+            celulas = [f"1 0 0 1 {fp_str(x0 + 6, y)} Tm {self.operador_texto(linha[0], fonte)}"]
+            for coluna in range(1, len(linha)):
+                celulas.append(deslocamentos[coluna - 1] + self.operador_texto(linha[coluna], fonte))
+            codigo.append(" ".join(celulas))
+        codigo.append("ET")
+        canvas.addLiteral("\n".join(codigo))
+
+        canvas.setStrokeColor(colors.black)
+        canvas.setLineWidth(1)
+        canvas.lines(
+            [(x0, topo - indice * altura_linha, x0 + largura_tabela, topo - indice * altura_linha) for indice in range(len(linhas) + 1)] +
+            [(x, topo, x, base) for x in posicoes]
+        )
+        canvas.restoreState()
+
+        self.y = base
+        self.espaco_anterior = 0
+
+    def adicionar_tabela(self, linhas, modelo):
+        inicio = 0
+
+        while True:
+            capacidade = int((self.y - self.base + 1e-6) // modelo.row_height) - 1
+            if capacidade < 1 and not self.no_topo():
+                self.nova_pagina()
+                continue
+
+            capacidade = max(capacidade, 1)
+            self.desenhar_grade([list(modelo.cabecalho)] + formatar_celulas(linhas[inicio:inicio + capacidade]), modelo)
+            inicio += capacidade
+
+            if inicio >= len(linhas):
+                break
+            self.nova_pagina()
+
+    def finalizar(self):
+        self.desenhar_numero_pagina()
+        self.canvas.save()
+        return self.paginas
+
+
+def criar_pdf_canvas(dados, nome_pdf, data_texto=None, perfil=None, table_data=None, resumo=False):
+    from reportlab.platypus import Paragraph, Spacer
+
+    if data_texto is None:
+        data_texto = obter_data_em_portugues()
+
+    modelo = obter_modelo()
+    pagina = PaginaCanvas(nome_pdf)
+
+    if table_data is None:
+        table_data = preparar_tabela(dados, perfil)
+    vagas_exclusivas_pcd = [row for row in table_data if row[4] == "Exclusivo PCD"]
+
+    with medir_etapa(perfil, "estatisticas"):
+        estatisticas = calcular_estatisticas(table_data)
+
+    with medir_etapa(perfil, "desenho"):
+        img, data_line, obs_line = montar_cabecalho(modelo, data_texto)
+        for flowable in (img, data_line, obs_line):
+            pagina.adicionar(flowable)
+        pagina.adicionar_tabela(table_data, modelo)
+
+        if vagas_exclusivas_pcd:
+            pagina.nova_pagina()
+            for flowable in (img, Paragraph("Vagas Exclusivas para PCD:", modelo.obs_style), obs_line, Spacer(1, 6)):
+                pagina.adicionar(flowable)
+            pagina.adicionar_tabela(vagas_exclusivas_pcd, modelo)
+
+        for flowable in montar_rodape(estatisticas["total_vagas"], modelo):
+            pagina.adicionar(flowable)
+
+        if resumo:
+            for flowable in montar_pagina_resumo(estatisticas, modelo):
+                pagina.adicionar(flowable)
+
+        paginas = pagina.finalizar()
+
+    registrar_contagens(perfil, len(table_data), paginas)
+    return paginas
+
+
+MOTORES = {"platypus": criar_pdf, "canvas": criar_pdf_canvas}
+
+
+def valores_linha(row):
+    return [row[indice] for indice in range(len(CABECALHO))]
+
+
+def converter_vagas(valor):
+    try:
+        return int(valor)
+    except ValueError:
+        return valor
+
+
+def escrever_csv(table_data, destino, data_texto=None):
+    with open(destino, "w", newline='', encoding='utf-8-sig') as arquivo:
+        escritor = csv.writer(arquivo, delimiter=';')
+        escritor.writerow(CABECALHO)
+        escritor.writerows(valores_linha(row) for row in table_data)
+
+
+def escrever_json(table_data, destino, data_texto):
+    estatisticas = calcular_estatisticas(table_data)
+    agencias = []
+    for posto, linhas in agrupar_por_posto(table_data).items():
+        vagas = [dict(zip(CABECALHO, valores_linha(row))) for row in linhas]
+        for vaga in vagas:
+            vaga["Vagas"] = converter_vagas(vaga["Vagas"])
+        agencias.append({"agencia": posto, "total_vagas": estatisticas["agencia"][posto], "vagas": vagas})
+
+    resumo = {
+        "data": data_texto,
+        "total_vagas": estatisticas["total_vagas"],
+        "total_linhas": len(table_data),
+        "linhas_exclusivas_pcd": sum(1 for row in table_data if row[4] == "Exclusivo PCD"),
+        "agencias": agencias,
+        "estatisticas": estatisticas,
+    }
+
+    with open(destino, "w", encoding="utf-8") as arquivo:
+        json.dump(resumo, arquivo, ensure_ascii=False, indent=2)
+
+
+def tabela_html(table_data):
+    cabecalho = "".join(f"<th>{html.escape(coluna)}</th>" for coluna in CABECALHO)
+    linhas = "\n".join("<tr>" + "".join(f"<td>{html.escape(str(valor))}</td>" for valor in valores_linha(row)) + "</tr>" for row in table_data)
+    return f"<table>\n<thead><tr>{cabecalho}</tr></thead>\n<tbody>\n{linhas}\n</tbody>\n</table>"
+
+
+def escrever_html(table_data, destino, data_texto):
+    modelo = obter_modelo()
+    vagas_exclusivas_pcd = [row for row in table_data if row[4] == "Exclusivo PCD"]
+    secao_pcd = f"<h2>Vagas Exclusivas para PCD:</h2>\n{tabela_html(vagas_exclusivas_pcd)}" if vagas_exclusivas_pcd else ""
+    legenda = "".join(f"<li>{html.escape(linha)}</li>" for linha in modelo.legenda)
+
+    pagina = f"""<!DOCTYPE html>
+<html lang="pt-BR">
+<head>
+<meta charset="utf-8">
+<title>Vagas SINE/PE - {html.escape(data_texto)}</title>
+<style>
+body {{ font-family: Helvetica, Arial, sans-serif; margin: 2em; }}
+h1, h2, .total {{ color: #c00; text-align: center; font-size: 1.1em; }}
+table {{ border-collapse: collapse; width: 100%; font-size: 0.85em; }}
+th {{ background: teal; color: whitesmoke; text-align: left; }}
+th, td {{ border: 1px solid black; padding: 4px 6px; }}
+</style>
+</head>
+<body>
+<h1>Vagas a serem publicadas para o dia: {html.escape(data_texto)}</h1>
+<h2>Obs: Vagas sujeitas a alterações no decorrer do dia.</h2>
+{tabela_html(table_data)}
+{secao_pcd}
+<p class="total">Total de Vagas: {contar_vagas(table_data)}</p>
+<p><strong>Legenda:</strong></p>
+<ul>{legenda}</ul>
+</body>
+</html>
+"""
+
+    with open(destino, "w", encoding="utf-8") as arquivo:
+        arquivo.write(pagina)
+
+
+ESCRITORES = {"html": escrever_html, "json": escrever_json, "csv": escrever_csv}
+
+
+def nome_saida(nome_pdf, formato):
+    return os.path.splitext(nome_pdf)[0] + "." + formato
+
+
+def escrever_formatos(table_data, nome_pdf, formatos, data_texto, perfil=None):
+    with medir_etapa(perfil, "formatos"):
+        for formato in formatos:
+            ESCRITORES[formato](table_data, nome_saida(nome_pdf, formato), data_texto)
+
+
+def renderizar_fragmento(nome_pdf, linhas, data_texto, pagina_inicial, primeiro, linhas_pcd=None, total_vagas=None, estatisticas=None):
+    doc = criar_documento(nome_pdf)
+    modelo = obter_modelo()
+    img, data_line, obs_line = montar_cabecalho(modelo, data_texto)
+    table_parts = []
+
+    if primeiro:
+        table_parts.extend([img, data_line, obs_line])
+        table_parts.extend(paginar_tabela(linhas, modelo, linhas_na_primeira_pagina(doc, table_parts), linhas_por_pagina(doc)))
+    elif linhas:
+        table_parts.extend(paginar_tabela(linhas, modelo, linhas_por_pagina(doc), linhas_por_pagina(doc)))
+
+    if total_vagas is not None:
+        if linhas_pcd:
+            table_parts.extend(montar_secao_pcd(linhas_pcd, modelo, img, obs_line, doc))
+        table_parts.extend(montar_rodape(total_vagas, modelo))
+
+    if estatisticas is not None:
+        table_parts.extend(montar_pagina_resumo(estatisticas, modelo))
+
+    paginas = construir_documento(doc, table_parts, pagina_inicial)
+    return nome_pdf, paginas
+
+
+def unir_pdfs(fragmentos, nome_pdf):
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for fragmento in fragmentos:
+        writer.append(fragmento)
+
+    # cada fragmento embute a sua cópia do logo: as idênticas viram um único objeto. A primeira passada
+    # une as máscaras (/SMask); só então as imagens que apontam para elas ficam iguais e são unidas na segunda
+    writer.compress_identical_objects()
+    writer.compress_identical_objects()
+
+    with open(nome_pdf, "wb") as arquivo:
+        writer.write(arquivo)
+
+
+def criar_pdf_fragmentado(dados, nome_pdf, data_texto=None, workers=1, paginas_por_fragmento=PAGINAS_POR_FRAGMENTO, perfil=None, table_data=None, resumo=False):
+    if data_texto is None:
+        data_texto = obter_data_em_portugues()
+
+    if table_data is None:
+        table_data = preparar_tabela(dados, perfil)
+    vagas_exclusivas_pcd = [row for row in table_data if row[4] == "Exclusivo PCD"]
+    with medir_etapa(perfil, "estatisticas"):
+        estatisticas = calcular_estatisticas(table_data)
+
+    doc = criar_documento(nome_pdf)
+    demais_paginas = linhas_por_pagina(doc)
+    primeira_pagina = linhas_na_primeira_pagina(doc, montar_cabecalho(obter_modelo(), data_texto))
+
+    limites = [0, min(len(table_data), primeira_pagina + (paginas_por_fragmento - 1) * demais_paginas)]
+    while limites[-1] < len(table_data):
+        limites.append(min(len(table_data), limites[-1] + paginas_por_fragmento * demais_paginas))
+
+    paralelo = workers > 1 and len(limites) > 2
+    # as linhas apontam para a tabela inteira: o que vai para outro processo leva só os códigos do seu trecho
+    enviar = recortar_linhas if paralelo else list
+
+    with tempfile.TemporaryDirectory() as pasta_temporaria:
+        argumentos = []
+        for indice, (inicio, fim) in enumerate(zip(limites, limites[1:])):
+            ultimo = fim == len(table_data)
+            argumentos.append((
+                os.path.join(pasta_temporaria, f"fragmento_{indice:05d}.pdf"),
+                enviar(table_data[inicio:fim]),
+                data_texto,
+                1 + indice * paginas_por_fragmento,
+                indice == 0,
+                enviar(vagas_exclusivas_pcd) if ultimo else None,
+                estatisticas["total_vagas"] if ultimo else None,
+                estatisticas if ultimo and resumo else None,
+            ))
+
+        with medir_etapa(perfil, "fragmentos"):
+            if not paralelo:
+                fragmentos = [renderizar_fragmento(*argumento) for argumento in argumentos]
+            else:
+                with criar_pool(min(workers, len(argumentos))) as executor:
+                    fragmentos = list(executor.map(renderizar_fragmento, *zip(*argumentos)))
+
+        with medir_etapa(perfil, "uniao"):
+            unir_pdfs([fragmento for fragmento, _ in fragmentos], nome_pdf)
+
+    registrar_contagens(perfil, len(table_data), sum(paginas for _, paginas in fragmentos))
+
+
+def nome_arquivo_agencia(posto):
+    texto = unicodedata.normalize("NFKD", str(posto)).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^A-Za-z0-9]+", "_", texto).strip("_") or "sem_agencia"
+
+
+def renderizar_agencia(nome_pdf, linhas, data_texto, motor="platypus", resumo=False):
+    return nome_pdf, MOTORES[motor](None, nome_pdf, data_texto, table_data=linhas, resumo=resumo)
+
+
+def criar_pdfs_por_agencia(dados, pasta_agencias, data_texto=None, workers=1, motor="platypus", perfil=None, table_data=None, resumo=False):
+    if data_texto is None:
+        data_texto = obter_data_em_portugues()
+
+    if not os.path.exists(pasta_agencias):
+        os.makedirs(pasta_agencias)
+
+    if table_data is None:
+        table_data = preparar_tabela(dados, perfil)
+    grupos = agrupar_por_posto(table_data)
+    vagas_por_agencia = calcular_estatisticas(table_data)["agencia"]
+    paralelo = workers > 1 and len(grupos) > 1
+    enviar = recortar_linhas if paralelo else list
+    argumentos = []
+
+    for posto, grupo_data in grupos.items():
+        argumentos.append((
+            os.path.join(pasta_agencias, nome_arquivo_agencia(posto) + "_relatorio.pdf"),
+            enviar(grupo_data),
+            data_texto,
+            motor,
+            resumo,
+        ))
+
+    with medir_etapa(perfil, "agencias"):
+        if not paralelo:
+            relatorios = [renderizar_agencia(*argumento) for argumento in argumentos]
+        else:
+            with criar_pool(min(workers, len(argumentos))) as executor:
+                relatorios = list(executor.map(renderizar_agencia, *zip(*argumentos)))
+    registrar_contagens(perfil, len(table_data), sum(paginas for _, paginas in relatorios))
+
+    nome_indice = os.path.join(pasta_agencias, "indice.csv")
+    with open(nome_indice, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.writer(arquivo, delimiter=";")
+        escritor.writerow(["Agência", "Arquivo", "Páginas", "Vagas"])
+        for posto, (nome_pdf, paginas) in zip(grupos, relatorios):
+            escritor.writerow([posto, os.path.basename(nome_pdf), paginas, vagas_por_agencia[posto]])
+
+    return nome_indice
+
+
+def nome_relatorio(arquivo_csv, pasta_output):
+    return os.path.join(pasta_output, os.path.splitext(os.path.basename(arquivo_csv))[0] + "_relatorio.pdf")
+
+
+def pasta_agencias(arquivo_csv, pasta_output):
+    return os.path.join(pasta_output, os.path.splitext(os.path.basename(arquivo_csv))[0] + "_agencias")
+
+
+def gerar_relatorio(arquivo_csv, pasta_output, data_texto, workers=1, paginas_por_fragmento=None, por_agencia=False, motor="platypus", perfilar=False, cprofile=False, formatos=(), leitor="auto", resumo=False):
+    nome_pdf = nome_relatorio(arquivo_csv, pasta_output)
+    nome_base = os.path.splitext(nome_pdf)[0]
+    perfil = PerfilRelatorio(arquivo_csv) if perfilar else None
+    perfilador = cProfile.Profile() if cprofile else None
+
+    try:
+        if perfilador is not None:
+            perfilador.enable()
+
+        with medir_etapa(perfil, "leitura"):
+            df = escolher_leitor(leitor, os.path.getsize(arquivo_csv))(arquivo_csv)
+        registrar_contagens(perfil, linhas=len(df))
+
+        table_data = preparar_tabela(df, perfil)
+        if por_agencia:
+            pasta = criar_pdfs_por_agencia(df, pasta_agencias(arquivo_csv, pasta_output), data_texto, workers, motor, perfil, table_data, resumo)
+            escrever_formatos(table_data, nome_pdf, formatos, data_texto, perfil)
+            return pasta, None
+
+        if paginas_por_fragmento:
+            criar_pdf_fragmentado(df, nome_pdf, data_texto, workers, paginas_por_fragmento, perfil, table_data, resumo)
+        else:
+            MOTORES[motor](df, nome_pdf, data_texto, perfil, table_data, resumo)
+        escrever_formatos(table_data, nome_pdf, formatos, data_texto, perfil)
+        return nome_pdf, None
+
+    except Exception as e:
+        return nome_pdf, e
+
+    finally:
+        if perfilador is not None:
+            perfilador.disable()
+            perfilador.dump_stats(nome_base + ".prof")
+        if perfil is not None:
+            perfil.salvar(nome_base + "_perfil.json")
+
+
+def gerar_pdf_em_memoria(conteudo_csv, data_texto=None, motor="platypus", leitor="auto", resumo=False):
+    saida = io.BytesIO()
+    df = escolher_leitor(leitor, len(conteudo_csv))(io.BytesIO(conteudo_csv))
+    MOTORES[motor](df, saida, data_texto, resumo=resumo)
+    return saida.getvalue()
+
+
+def gerar_relatorio_isolado(arquivo_csv, pasta_output, data_texto, *args, **opcoes):
+    # um processo só para este arquivo: se ele morrer, só este relatório falha
+    with criar_pool(1) as executor:
         try:
-            total_vagas += int(row[1])
-        except ValueError:
-            pass
+            return executor.submit(gerar_relatorio, arquivo_csv, pasta_output, data_texto, *args, **opcoes).result()
+        except BrokenProcessPool as e:
+            return nome_relatorio(arquivo_csv, pasta_output), e
+
+
+def gerar_relatorios(arquivos_csv, pasta_output, data_texto, workers=1, paginas_por_fragmento=None, por_agencia=False, motor="platypus", perfilar=False, cprofile=False, formatos=(), leitor="auto", resumo=False):
+    arquivos_csv = list(dict.fromkeys(arquivos_csv))
+    opcoes = {"perfilar": perfilar, "cprofile": cprofile, "formatos": formatos, "leitor": leitor, "resumo": resumo}
 
-    paragrafo_vazio = Paragraph ("-", vazio_style)
-    paragrafo_total_vagas = Paragraph(f"Total de Vagas: {total_vagas}", obs_style)
-    table_parts.append(paragrafo_vazio)
-    table_parts.append(paragrafo_total_vagas)
+    if perfilar:
+        # ru_maxrss só cresce: um processo novo por relatório impede que o pico de um apareça no perfil do seguinte
+        paralelos = 1 if paginas_por_fragmento or por_agencia else max(1, min(workers, len(arquivos_csv)))
+        with ThreadPoolExecutor(paralelos) as executor:
+            resultados = executor.map(lambda arquivo_csv: gerar_relatorio_isolado(arquivo_csv, pasta_output, data_texto, workers, paginas_por_fragmento, por_agencia, motor, **opcoes), arquivos_csv)
+            for arquivo_csv, resultado in zip(arquivos_csv, resultados):
+                yield arquivo_csv, *resultado
+        return
 
-    paragrafo_legenda0 = Paragraph("Legenda:", legenda_style)
-    paragrafo_legenda1 = Paragraph("Exclusivo PCD = Exclusivo para Pessoa com Deficiência")
-    paragrafo_legenda2 = Paragraph("Não C. = Não Completo")
-    table_parts.append(paragrafo_legenda0)
-    table_parts.append(paragrafo_legenda1)
-    table_parts.append(paragrafo_legenda2)
+    if paginas_por_fragmento or por_agencia:
+        for arquivo_csv in arquivos_csv:
+            yield arquivo_csv, *gerar_relatorio(arquivo_csv, pasta_output, data_texto, workers, paginas_por_fragmento, por_agencia, **opcoes)
+        return
 
-    doc.build(table_parts)
+    if workers <= 1 or len(arquivos_csv) <= 1:
+        for arquivo_csv in arquivos_csv:
+            yield arquivo_csv, *gerar_relatorio(arquivo_csv, pasta_output, data_texto, motor=motor, **opcoes)
+        return
+
+    sem_resultado = []
+
+    with criar_pool(min(workers, len(arquivos_csv))) as executor:
+        futuros = [executor.submit(gerar_relatorio, arquivo_csv, pasta_output, data_texto, motor=motor, **opcoes) for arquivo_csv in arquivos_csv]
+
+        for arquivo_csv, futuro in zip(arquivos_csv, futuros):
+            try:
+                yield arquivo_csv, *futuro.result()
+            except BrokenProcessPool:
+                # um processo morreu (OOM, segfault) e derrubou o pool: todos os pendentes recebem o erro
+                sem_resultado.append(arquivo_csv)
+            except Exception as e:
+                yield arquivo_csv, nome_relatorio(arquivo_csv, pasta_output), e
+
+    if sem_resultado:
+        with ThreadPoolExecutor(min(workers, len(sem_resultado))) as executor:
+            resultados = executor.map(lambda arquivo_csv: gerar_relatorio_isolado(arquivo_csv, pasta_output, data_texto, motor=motor, **opcoes), sem_resultado)
+            for arquivo_csv, resultado in zip(sem_resultado, resultados):
+                yield arquivo_csv, *resultado
+
+
+def calcular_hash_arquivo(caminho):
+    hash_arquivo = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+            hash_arquivo.update(bloco)
+    return hash_arquivo.hexdigest()
+
+
+def calcular_hash_configuracao(data_texto, paginas_por_fragmento=None, por_agencia=False, motor="platypus", formatos=(), resumo=False):
+    configuracao = {
+        "versao": VERSAO_GERADOR,
+        "escala_logo": ESCALA_LOGO,
+        "codigo": calcular_hash_arquivo(os.path.abspath(__file__)),
+        "logo": calcular_hash_arquivo(IMG_PATH) if os.path.exists(IMG_PATH) else None,
+        "colunas": DATA_COLUMNS,
+        "cabecalho": CABECALHO,
+        "col_widths": COL_WIDTHS,
+        "row_height": ROW_HEIGHT,
+        "abreviacoes": ABREVIACOES_POSTO,
+        "data_texto": data_texto,
+        "paginas_por_fragmento": paginas_por_fragmento,
+        "por_agencia": por_agencia,
+        "motor": motor,
+        "formatos": sorted(formatos),
+        "resumo": resumo,
+    }
+    return hashlib.sha256(json.dumps(configuracao, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def carregar_manifesto(pasta_output, arquivo=ARQUIVO_MANIFESTO):
+    caminho = os.path.join(pasta_output, arquivo)
+    if not os.path.exists(caminho):
+        return {}
+
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return {}
+
+
+def salvar_manifesto(pasta_output, manifesto, arquivo=ARQUIVO_MANIFESTO):
+    caminho = os.path.join(pasta_output, arquivo)
+    with open(caminho + ".tmp", "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo, indent=2, sort_keys=True, ensure_ascii=False)
+    os.replace(caminho + ".tmp", caminho)
+
+
+def assinatura_entrada(arquivo_csv, hash_configuracao):
+    return {"entrada": calcular_hash_arquivo(arquivo_csv), "configuracao": hash_configuracao}
+
+
+def entrada_atual(manifesto, arquivo_csv, assinatura):
+    anterior = manifesto.get(arquivo_csv)
+    return bool(anterior) and all(anterior.get(chave) == valor for chave, valor in assinatura.items()) and os.path.exists(anterior.get("saida", ""))
+
+
+def separar_pendentes(arquivos_csv, manifesto, hash_configuracao):
+    pendentes = []
+    ignorados = []
+    assinaturas = {}
+
+    for arquivo_csv in dict.fromkeys(arquivos_csv):
+        assinatura = assinatura_entrada(arquivo_csv, hash_configuracao)
+
+        if entrada_atual(manifesto, arquivo_csv, assinatura):
+            ignorados.append((arquivo_csv, manifesto[arquivo_csv]["saida"]))
+        else:
+            pendentes.append(arquivo_csv)
+            assinaturas[arquivo_csv] = assinatura
+
+    return pendentes, ignorados, assinaturas
+
+
+class CacheRelatorios:
+    def __init__(self, pasta=PASTA_CACHE, tamanho_maximo_mb=TAMANHO_CACHE_MB):
+        self.pasta = pasta
+        self.tamanho_maximo = tamanho_maximo_mb * 1024 * 1024
+        os.makedirs(pasta, exist_ok=True)
+
+    @staticmethod
+    def chave(hash_entrada, hash_configuracao):
+        return hashlib.sha256(f"{hash_entrada}:{hash_configuracao}".encode("ascii")).hexdigest()
+
+    def caminho(self, chave):
+        return os.path.join(self.pasta, chave + ".pdf")
+
+    def obter(self, chave):
+        caminho = self.caminho(chave)
+        try:
+            # a data de modificação marca o último uso, para a remoção LRU
+            os.utime(caminho)
+        except FileNotFoundError:
+            return None
+        return caminho
+
+    def ler(self, chave):
+        caminho = self.obter(chave)
+        if caminho is None:
+            return None
+
+        try:
+            with open(caminho, "rb") as arquivo:
+                return arquivo.read()
+        except FileNotFoundError:
+            return None
+
+    def guardar(self, chave, conteudo):
+        descritor, temporario = tempfile.mkstemp(dir=self.pasta, suffix=".tmp")
+        with os.fdopen(descritor, "wb") as arquivo:
+            arquivo.write(conteudo)
+        os.replace(temporario, self.caminho(chave))
+        self.podar()
+
+    def guardar_arquivo(self, chave, origem):
+        with open(origem, "rb") as arquivo:
+            self.guardar(chave, arquivo.read())
+
+    def podar(self):
+        entradas = []
+        with os.scandir(self.pasta) as itens:
+            for item in itens:
+                if not item.name.endswith(".pdf"):
+                    continue
+                try:
+                    estado = item.stat()
+                except FileNotFoundError:
+                    continue
+                entradas.append((estado.st_mtime_ns, estado.st_size, item.path))
+
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= self.tamanho_maximo:
+                break
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+            total -= tamanho
+
+
+def servir_do_cache(arquivos_csv, assinaturas, cache, pasta_output):
+    pendentes = []
+    servidos = []
+
+    for arquivo_csv in arquivos_csv:
+        assinatura = assinaturas[arquivo_csv]
+        em_cache = cache.obter(cache.chave(assinatura["entrada"], assinatura["configuracao"]))
+
+        if em_cache is None:
+            pendentes.append(arquivo_csv)
+        else:
+            nome_pdf = nome_relatorio(arquivo_csv, pasta_output)
+            shutil.copyfile(em_cache, nome_pdf)
+            servidos.append((arquivo_csv, nome_pdf))
+
+    return pendentes, servidos
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera relatórios em PDF a partir das exportações de vagas da SEDEPE.")
+    parser.add_argument("--workers", type=int, default=1, help="número de processos usados para gerar os relatórios em paralelo")
+    parser.add_argument("--paginas-por-fragmento", type=int, default=None, help="divide cada relatório em fragmentos com este número de páginas, renderizados em paralelo e unidos ao final")
+    parser.add_argument("--por-agencia", action="store_true", help="gera um relatório por agência e um índice com páginas e vagas de cada uma")
+    parser.add_argument("--forcar", action="store_true", help="regera todos os relatórios, mesmo os que não mudaram desde a última execução")
+    parser.add_argument("--motor", choices=sorted(MOTORES), default="platypus", help="motor de renderização dos relatórios, inteiros ou por agência (canvas desenha a grade diretamente, sem o fluxo do platypus)")
+    parser.add_argument("--perfil", action="store_true", help="grava, ao lado de cada relatório, um JSON com tempo, CPU e pico de memória de cada etapa")
+    parser.add_argument("--cprofile", action="store_true", help="grava um dump do cProfile (.prof) para cada relatório")
+    parser.add_argument("--cache", nargs="?", const=PASTA_CACHE, default=None, help=f"reaproveita PDFs já gerados para o mesmo conteúdo e configuração, guardados nesta pasta (padrão: {PASTA_CACHE})")
+    parser.add_argument("--cache-max-mb", type=int, default=TAMANHO_CACHE_MB, help="tamanho máximo do cache; os PDFs usados há mais tempo são removidos primeiro")
+    parser.add_argument("--leitor", choices=["auto"] + sorted(LEITORES), default="auto", help=f"leitura do CSV: bytes (sem pandas, só os campos usados), mmap (arquivo mapeado, campos decodificados sob demanda), pandas, ou auto (bytes até {LIMITE_LEITURA_SIMPLES // (1024 * 1024)} MB, mmap acima)")
+    parser.add_argument("--resumo", action="store_true", help="acrescenta ao PDF uma página com as vagas por agência, município, contrato e escolaridade e as exclusivas para PCD")
+    parser.add_argument("--formatos", nargs="+", choices=sorted(ESCRITORES), default=[], help="além do PDF, grava a mesma tabela nestes formatos (HTML estático, JSON por agência, CSV normalizado)")
+    args = parser.parse_args()
+
+    if args.por_agencia and args.paginas_por_fragmento:
+        parser.error("--paginas-por-fragmento não se aplica com --por-agencia: cada agência já é um relatório próprio, renderizado em paralelo com --workers")
+
     pasta_output = "output"
 
     if not os.path.exists(pasta_output):
         os.makedirs(pasta_output)
 
     data_texto = obter_data_em_portugues()    
-    csv_files = [file for file in os.listdir() if file.endswith(".csv")]
+    csv_files = sorted(file for file in os.listdir() if file.endswith(".csv"))
+    sucessos = 0
+    falhas = 0
 
-    for csv_file in csv_files:
-        lista_de_dataframes = ler_csv(csv_file)
+    manifesto = {} if args.forcar else carregar_manifesto(pasta_output)
+    hash_configuracao = calcular_hash_configuracao(data_texto, args.paginas_por_fragmento, args.por_agencia, args.motor, args.formatos, args.resumo)
+    csv_files, ignorados, assinaturas = separar_pendentes(csv_files, manifesto, hash_configuracao)
 
-        for df in lista_de_dataframes:
-            df.sort_values(by='Posto', inplace=True)
-            filtered_df = df[~df['Posto'].str.startswith('-')]
-            
-            if not filtered_df.empty:  
-                nome_pdf = os.path.join(pasta_output, os.path.splitext(csv_file)[0] + "_relatorio.pdf")
-            
-            nome_pdf = os.path.join(pasta_output, os.path.splitext(csv_file)[0] + "_relatorio.pdf")
+    for csv_file, nome_pdf in ignorados:
+        print(f"Relatório sem alterações, mantido: {nome_pdf}")
 
-            try:
-                criar_pdf(df, nome_pdf)
-                print(f"Relatório gerado com sucesso: {nome_pdf}")
+    # o cache guarda só o PDF: o modo por agência e os formatos extras sempre geram de novo
+    cache = CacheRelatorios(args.cache, args.cache_max_mb) if args.cache and not args.por_agencia and not args.formatos else None
+    servidos = []
+    if cache is not None:
+        csv_files, servidos = servir_do_cache(csv_files, assinaturas, cache, pasta_output)
 
-            except Exception as e:
-                print(f"Erro ao gerar o relatório para {nome_pdf}: {e}")
+    for csv_file, nome_pdf in servidos:
+        manifesto[csv_file] = dict(assinaturas[csv_file], saida=nome_pdf)
+        print(f"Relatório servido do cache: {nome_pdf}")
+
+    for csv_file, nome_pdf, erro in gerar_relatorios(csv_files, pasta_output, data_texto, args.workers, args.paginas_por_fragmento, args.por_agencia, args.motor, args.perfil, args.cprofile, args.formatos, args.leitor, args.resumo):
+        if erro is None:
+            sucessos += 1
+            manifesto[csv_file] = dict(assinaturas[csv_file], saida=nome_pdf)
+            if cache is not None:
+                cache.guardar_arquivo(cache.chave(assinaturas[csv_file]["entrada"], assinaturas[csv_file]["configuracao"]), nome_pdf)
+            print(f"Relatório gerado com sucesso: {nome_pdf}")
+        else:
+            falhas += 1
+            manifesto.pop(csv_file, None)
+            print(f"Erro ao gerar o relatório para {nome_pdf}: {erro}")
+
+    if csv_files or servidos:
+        salvar_manifesto(pasta_output, manifesto)
+
+    print(f"Resumo: {sucessos} relatório(s) gerado(s), {len(servidos)} do cache, {len(ignorados)} sem alterações, {falhas} falha(s).")
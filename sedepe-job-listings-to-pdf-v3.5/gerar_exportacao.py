@@ -0,0 +1,122 @@
+import os
+import csv
+import argparse
+
+import numpy as np
+
+
+TAMANHOS = [1000, 10000, 100000, 1000000]
+LARGURA_TEXTO = 150
+LARGURA_NUMERO = 20
+COLUNAS_NUMERICAS = ["Qtd. Vagas Disponíveis", "Qtd. Encaminhamentos Disponíveis", "Salário", "Tempo de Experiência", "Idade (Inicial)", "Idade (Final)"]
+COLUNA_ID = "Id. Vaga"
+LINHAS_POR_ESCRITA = 10000
+
+
+def carregar_base(arquivo_csv):
+    with open(arquivo_csv, newline='', encoding='latin1') as arquivo:
+        leitor = csv.reader(arquivo, delimiter=';')
+        cabecalho = [coluna for coluna in next(leitor) if coluna]
+        linhas = [[campo.rstrip() for campo in linha[:len(cabecalho)]] for linha in leitor]
+
+    return cabecalho, linhas[:-1]
+
+
+def converter_numero(valor):
+    try:
+        return float(valor.replace('.', '').replace(',', '.'))
+    except ValueError:
+        return 0.0
+
+
+def formatar_numero(valor, casas=0):
+    texto = f"{valor:,.{casas}f}"
+    return texto.replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+def gerar_vagas(cabecalho, base, linhas, semente=0):
+    gerador = np.random.default_rng(semente)
+    indice_id = cabecalho.index(COLUNA_ID)
+    indice_qtd = cabecalho.index("Qtd. Vagas Disponíveis")
+    quantidades = [linha[indice_qtd] for linha in base]
+    primeiro_id = max(int(linha[indice_id]) for linha in base if linha[indice_id].isdigit()) + 1
+
+    for inicio in range(0, linhas, LINHAS_POR_ESCRITA):
+        tamanho = min(LINHAS_POR_ESCRITA, linhas - inicio)
+        sorteadas = gerador.integers(0, len(base), tamanho)
+        qtds = gerador.integers(0, len(quantidades), tamanho)
+
+        bloco = []
+        for deslocamento, (indice, indice_qtd_sorteada) in enumerate(zip(sorteadas, qtds)):
+            linha = list(base[indice])
+            linha[indice_id] = str(primeiro_id + inicio + deslocamento)
+            linha[indice_qtd] = quantidades[indice_qtd_sorteada]
+            bloco.append(linha)
+        yield bloco
+
+
+def montar_rodape(cabecalho, totais):
+    rodape = []
+    for coluna in cabecalho:
+        if coluna == "Salário":
+            rodape.append(formatar_numero(totais[coluna], 2))
+        elif coluna in totais:
+            rodape.append(formatar_numero(totais[coluna]))
+        else:
+            rodape.append("-")
+    return rodape
+
+
+def escrever_exportacao(cabecalho, blocos, destino):
+    larguras = [LARGURA_NUMERO if coluna in COLUNAS_NUMERICAS else LARGURA_TEXTO for coluna in cabecalho]
+    numericas = [(indice, coluna) for indice, coluna in enumerate(cabecalho) if coluna in COLUNAS_NUMERICAS]
+    totais = {coluna: 0.0 for _, coluna in numericas}
+
+    def preencher(linha):
+        return ";".join(campo.ljust(largura) for campo, largura in zip(linha, larguras))
+
+    with open(destino, "w", newline='', encoding='latin1') as arquivo:
+        arquivo.write(";".join(cabecalho) + ";\n")
+
+        for bloco in blocos:
+            for linha in bloco:
+                for indice, coluna in numericas:
+                    totais[coluna] += converter_numero(linha[indice])
+            arquivo.write("\n".join(preencher(linha) for linha in bloco) + "\n")
+
+        arquivo.write(preencher(montar_rodape(cabecalho, totais)) + "\n")
+
+
+def gerar_exportacao(base_csv, linhas, destino, semente=0):
+    cabecalho, base = carregar_base(base_csv)
+    escrever_exportacao(cabecalho, gerar_vagas(cabecalho, base, linhas, semente), destino)
+    return destino
+
+
+def nome_exportacao(pasta, linhas):
+    return os.path.join(pasta, f"vagas_{linhas}.csv")
+
+
+def exportacao_sintetica(pasta, linhas, base_csv):
+    # reaproveita a exportação já gerada com o mesmo tamanho; usada pelos benchmarks
+    destino = nome_exportacao(pasta, linhas)
+    if not os.path.exists(destino):
+        os.makedirs(pasta, exist_ok=True)
+        gerar_exportacao(base_csv, linhas, destino)
+    return destino
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera exportações sintéticas do SEDEPE amostrando as vagas de uma exportação real.")
+    parser.add_argument("--base", default="exemplo.csv", help="exportação real usada como distribuição das vagas")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=TAMANHOS, help="quantidades de vagas a gerar")
+    parser.add_argument("--pasta", default="sinteticos", help="pasta de destino das exportações geradas")
+    parser.add_argument("--semente", type=int, default=0, help="semente do sorteio, para exportações reproduzíveis")
+    args = parser.parse_args()
+
+    os.makedirs(args.pasta, exist_ok=True)
+
+    for linhas in args.tamanhos:
+        destino = nome_exportacao(args.pasta, linhas)
+        gerar_exportacao(args.base, linhas, destino, args.semente)
+        print(f"Exportação gerada: {destino} ({linhas} vagas)")
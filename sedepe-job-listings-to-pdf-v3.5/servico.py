@@ -0,0 +1,199 @@
+import os
+import json
+import signal
+import hashlib
+import argparse
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import TimeoutError as TempoEsgotado
+from concurrent.futures.process import BrokenProcessPool
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from generate_pdf_code import MOTORES, PASTA_CACHE, TAMANHO_CACHE_MB, CacheRelatorios, criar_pool, aquecer_processo, gerar_pdf_em_memoria, obter_data_em_portugues, calcular_hash_configuracao
+
+
+TAMANHO_MAXIMO_CSV = 200 * 1024 * 1024
+TEMPO_LIMITE = 120
+
+
+class ServicoRelatorios(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, endereco, workers, fila, tempo_limite=TEMPO_LIMITE, cache=None):
+        super().__init__(endereco, ManipuladorRelatorios)
+        self.workers = workers
+        self.tempo_limite = tempo_limite
+        self.cache = cache
+        self.capacidade = workers + fila
+        self.em_andamento = 0
+        self.trava = threading.Lock()
+        self.trava_pool = threading.Lock()
+        self.executor = criar_pool(workers)
+
+        for futuro in [self.executor.submit(aquecer_processo) for _ in range(workers)]:
+            futuro.result()
+
+    def reservar(self):
+        with self.trava:
+            if self.em_andamento >= self.capacidade:
+                return False
+            self.em_andamento += 1
+            return True
+
+    def liberar(self):
+        with self.trava:
+            self.em_andamento -= 1
+
+    def recriar_pool(self, quebrado):
+        # só a primeira requisição que encontra o pool quebrado o substitui
+        with self.trava_pool:
+            if self.executor is quebrado:
+                quebrado.shutdown(wait=False)
+                self.executor = criar_pool(self.workers)
+
+    def submeter(self, *args, **kwargs):
+        executor = self.executor
+        try:
+            return executor.submit(*args, **kwargs)
+        except BrokenProcessPool:
+            # um worker morreu (OOM, segfault, kill) e derrubou o pool: recria e tenta uma vez no novo
+            self.recriar_pool(executor)
+            return self.executor.submit(*args, **kwargs)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(cancel_futures=True)
+
+
+def extrair_csv(cabecalhos, corpo):
+    tipo = cabecalhos.get("Content-Type", "")
+    if not tipo.startswith("multipart/form-data"):
+        return corpo
+
+    mensagem = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {tipo}\r\n\r\n".encode("latin1") + corpo)
+    for parte in mensagem.iter_parts():
+        if parte.get_filename() or parte.get_param("name", header="content-disposition") == "csv":
+            return parte.get_payload(decode=True)
+    return b""
+
+
+class ManipuladorRelatorios(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def responder(self, status, corpo, tipo="application/json; charset=utf-8", cabecalhos=None):
+        if isinstance(corpo, dict):
+            corpo = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/saude":
+            self.responder(404, {"erro": "Rota não encontrada."})
+            return
+
+        self.responder(200, {"workers": self.server.workers, "em_andamento": self.server.em_andamento, "capacidade": self.server.capacidade})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/relatorio":
+            self.responder(404, {"erro": "Rota não encontrada."})
+            return
+
+        try:
+            tamanho = int(self.headers["Content-Length"])
+        except (TypeError, ValueError):
+            tamanho = -1
+        if tamanho < 0:
+            self.close_connection = True
+            self.responder(400, {"erro": "Cabeçalho Content-Length ausente ou inválido."})
+            return
+        if tamanho > TAMANHO_MAXIMO_CSV:
+            self.close_connection = True
+            self.responder(413, {"erro": "Arquivo CSV grande demais."})
+            return
+
+        parametros = parse_qs(url.query)
+        motor = parametros.get("motor", ["platypus"])[0]
+        data_texto = parametros.get("data", [obter_data_em_portugues()])[0]
+        resumo = parametros.get("resumo", ["0"])[0] in ("1", "sim", "true")
+        conteudo = extrair_csv(self.headers, self.rfile.read(tamanho))
+
+        if motor not in MOTORES:
+            self.responder(400, {"erro": f"Motor desconhecido: {motor}"})
+            return
+        if not conteudo:
+            self.responder(400, {"erro": "Envie o CSV exportado da SEDEPE no corpo da requisição."})
+            return
+
+        chave = None
+        if self.server.cache is not None:
+            chave = self.server.cache.chave(hashlib.sha256(conteudo).hexdigest(), calcular_hash_configuracao(data_texto, motor=motor, resumo=resumo))
+            pdf = self.server.cache.ler(chave)
+            if pdf is not None:
+                self.responder(200, pdf, "application/pdf", {"Content-Disposition": 'inline; filename="relatorio.pdf"', "X-Cache": "HIT"})
+                return
+
+        if not self.server.reservar():
+            self.responder(503, {"erro": "Fila de relatórios cheia, tente novamente."}, cabecalhos={"Retry-After": "1"})
+            return
+
+        # a vaga só é liberada quando o trabalho termina de fato, mesmo depois de um 504
+        try:
+            futuro = self.server.submeter(gerar_pdf_em_memoria, conteudo, data_texto, motor, resumo=resumo)
+        except Exception:
+            self.server.liberar()
+            self.responder(503, {"erro": "Serviço de geração indisponível, tente novamente."}, cabecalhos={"Retry-After": "1"})
+            return
+        futuro.add_done_callback(lambda _: self.server.liberar())
+
+        try:
+            pdf = futuro.result(self.server.tempo_limite)
+        except TempoEsgotado:
+            futuro.cancel()
+            self.responder(504, {"erro": "Tempo limite excedido ao gerar o relatório."})
+            return
+        except BrokenProcessPool:
+            # o processo morreu durante a geração; o pool é recriado no próximo envio
+            self.responder(500, {"erro": "O processo que gerava o relatório foi interrompido, tente novamente."})
+            return
+        except Exception as e:
+            self.responder(422, {"erro": f"Erro ao gerar o relatório: {e}"})
+            return
+
+        if chave is not None:
+            self.server.cache.guardar(chave, pdf)
+        self.responder(200, pdf, "application/pdf", {"Content-Disposition": 'inline; filename="relatorio.pdf"', "X-Cache": "MISS" if chave else "DESATIVADO"})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço HTTP local que gera o relatório em PDF a partir de um CSV enviado por POST /relatorio.")
+    parser.add_argument("--host", default="127.0.0.1", help="endereço de escuta (por padrão só a máquina local)")
+    parser.add_argument("--porta", type=int, default=8000, help="porta de escuta")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processos pré-aquecidos que geram os relatórios")
+    parser.add_argument("--fila", type=int, default=None, help="requisições aguardando além das em execução (padrão: 2 por worker); acima disso responde 503")
+    parser.add_argument("--tempo-limite", type=float, default=TEMPO_LIMITE, help="segundos de espera por relatório antes de responder 504")
+    parser.add_argument("--cache", nargs="?", const=PASTA_CACHE, default=None, help=f"responde do cache de PDFs quando o mesmo CSV já foi gerado (padrão: {PASTA_CACHE})")
+    parser.add_argument("--cache-max-mb", type=int, default=TAMANHO_CACHE_MB, help="tamanho máximo do cache; os PDFs usados há mais tempo são removidos primeiro")
+    args = parser.parse_args()
+
+    fila = 2 * args.workers if args.fila is None else args.fila
+    cache = CacheRelatorios(args.cache, args.cache_max_mb) if args.cache else None
+    servico = ServicoRelatorios((args.host, args.porta), args.workers, fila, args.tempo_limite, cache)
+    print(f"Serviço de relatórios em http://{args.host}:{args.porta}/relatorio ({args.workers} worker(s), fila de {fila})")
+
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    try:
+        servico.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servico.server_close()
@@ -0,0 +1,161 @@
+import os
+import time
+import signal
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from generate_pdf_code import MOTORES, criar_pool, gerar_relatorio, gerar_relatorio_isolado, obter_data_em_portugues, calcular_hash_configuracao, assinatura_entrada, entrada_atual, carregar_manifesto, salvar_manifesto
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+
+ARQUIVO_REGISTRO = "vigia.json"
+ESPERA_ESTABILIDADE = 2.0
+INTERVALO = 1.0
+
+
+def criar_observador(pasta_entrada):
+    if INotify is None:
+        return None
+
+    observador = INotify()
+    observador.add_watch(pasta_entrada, flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.MODIFY)
+    return observador
+
+
+def aguardar(observador, intervalo):
+    if observador is None:
+        time.sleep(intervalo)
+    else:
+        observador.read(timeout=int(intervalo * 1000), read_delay=50)
+
+
+def assinatura_arquivo(caminho):
+    estado = os.stat(caminho)
+    return estado.st_size, estado.st_mtime_ns
+
+
+def listar_csvs(pasta_entrada):
+    return sorted(os.path.join(pasta_entrada, nome) for nome in os.listdir(pasta_entrada) if nome.endswith(".csv"))
+
+
+def atualizar_candidatos(candidatos, pasta_entrada, espera):
+    agora = time.monotonic()
+    estaveis = []
+    presentes = set()
+
+    for caminho in listar_csvs(pasta_entrada):
+        try:
+            assinatura = assinatura_arquivo(caminho)
+        except OSError:
+            continue
+
+        presentes.add(caminho)
+        anterior = candidatos.get(caminho)
+        if anterior is None or anterior[0] != assinatura:
+            candidatos[caminho] = (assinatura, agora)
+        elif agora - anterior[1] >= espera:
+            estaveis.append((caminho, assinatura))
+
+    for caminho in set(candidatos) - presentes:
+        del candidatos[caminho]
+
+    return estaveis
+
+
+def recriar_pool(executor, workers):
+    executor.shutdown(wait=False)
+    return criar_pool(workers)
+
+
+def registrar_resultado(registro, caminho, assinatura, nome_pdf, erro):
+    if erro is None:
+        registro[caminho] = dict(assinatura, saida=nome_pdf)
+        print(f"Relatório gerado com sucesso: {nome_pdf}")
+    else:
+        print(f"Erro ao gerar o relatório para {nome_pdf}: {erro}")
+
+
+def vigiar(pasta_entrada, pasta_output, workers=1, motor="platypus", espera=ESPERA_ESTABILIDADE, intervalo=INTERVALO, usar_inotify=True):
+    os.makedirs(pasta_output, exist_ok=True)
+
+    # a data fica fora do hash: o vigia roda por dias e não deve regerar tudo à meia-noite
+    hash_configuracao = calcular_hash_configuracao(None, motor=motor)
+    registro = carregar_manifesto(pasta_output, ARQUIVO_REGISTRO)
+    observador = criar_observador(pasta_entrada) if usar_inotify else None
+    candidatos = {}
+    processados = {}
+    em_andamento = {}
+
+    print(f"Vigiando {pasta_entrada} ({'inotify' if observador else 'varredura periódica'}), relatórios em {pasta_output}")
+
+    executor = criar_pool(workers)
+    isolador = ThreadPoolExecutor(workers)
+
+    try:
+        while True:
+            for caminho, assinatura in atualizar_candidatos(candidatos, pasta_entrada, espera):
+                if caminho in em_andamento or processados.get(caminho) == assinatura:
+                    continue
+
+                assinatura_registro = assinatura_entrada(caminho, hash_configuracao)
+                processados[caminho] = assinatura
+                if entrada_atual(registro, caminho, assinatura_registro):
+                    continue
+
+                try:
+                    futuro = executor.submit(gerar_relatorio, caminho, pasta_output, obter_data_em_portugues(), motor=motor)
+                except BrokenProcessPool:
+                    # o pool caído só é trocado quando chega o próximo arquivo
+                    executor = recriar_pool(executor, workers)
+                    futuro = executor.submit(gerar_relatorio, caminho, pasta_output, obter_data_em_portugues(), motor=motor)
+                em_andamento[caminho] = (futuro, assinatura_registro)
+                print(f"Na fila: {caminho}")
+
+            for caminho in [caminho for caminho, (futuro, _) in em_andamento.items() if futuro.done()]:
+                futuro, assinatura = em_andamento.pop(caminho)
+                try:
+                    nome_pdf, erro = futuro.result()
+                except BrokenProcessPool:
+                    # pool quebrado: cada afetado é refeito num processo só dele
+                    em_andamento[caminho] = (isolador.submit(gerar_relatorio_isolado, caminho, pasta_output, obter_data_em_portugues(), motor=motor), assinatura)
+                    continue
+
+                registrar_resultado(registro, caminho, assinatura, nome_pdf, erro)
+                if erro is None:
+                    salvar_manifesto(pasta_output, registro, ARQUIVO_REGISTRO)
+
+            aguardar(observador, intervalo)
+
+    except KeyboardInterrupt:
+        print(f"Encerrando; aguardando {len(em_andamento)} relatório(s) em andamento.")
+        for caminho, (futuro, assinatura) in em_andamento.items():
+            try:
+                nome_pdf, erro = futuro.result()
+            except Exception as e:
+                nome_pdf, erro = caminho, e
+            registrar_resultado(registro, caminho, assinatura, nome_pdf, erro)
+        salvar_manifesto(pasta_output, registro, ARQUIVO_REGISTRO)
+
+    finally:
+        executor.shutdown()
+        isolador.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vigia uma pasta e gera o relatório de cada exportação CSV assim que ela termina de ser gravada.")
+    parser.add_argument("pasta", nargs="?", default="entrada", help="pasta vigiada onde as exportações são depositadas")
+    parser.add_argument("--output", default="output", help="pasta dos relatórios e do registro do vigia")
+    parser.add_argument("--workers", type=int, default=1, help="processos usados para gerar os relatórios")
+    parser.add_argument("--motor", choices=sorted(MOTORES), default="platypus", help="motor de renderização")
+    parser.add_argument("--espera", type=float, default=ESPERA_ESTABILIDADE, help="segundos sem mudança de tamanho/data antes de considerar o arquivo completo")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO, help="intervalo máximo, em segundos, entre varreduras da pasta")
+    parser.add_argument("--sem-inotify", action="store_true", help="usa só a varredura periódica, mesmo com inotify disponível")
+    args = parser.parse_args()
+
+    os.makedirs(args.pasta, exist_ok=True)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    vigiar(os.path.abspath(args.pasta), args.output, args.workers, args.motor, args.espera, args.intervalo, not args.sem_inotify)